@@ -3,12 +3,39 @@
 with the flask instance app"""
 
 from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from models import storage
+from models.engine import serializer
 from api.v1.views import app_views
 from os import getenv
+from sqlalchemy.exc import IntegrityError
+
+
+class JSONProvider(DefaultJSONProvider):
+    """this serializes the API bodies with the storage serializer"""
+
+    def dumps(self, obj, **kwargs):
+        """this method serializes obj through the storage serializer,
+        leaving pretty-printed and customised output to the stdlib"""
+        if set(kwargs) - {"separators"} or \
+                kwargs.get("separators", (",", ":")) != (",", ":"):
+            return super().dumps(obj, **kwargs)
+        try:
+            return serializer.dumps(obj, default=self.default,
+                                    sort_keys=self.sort_keys)
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        """this method parses a JSON document"""
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return serializer.loads(s)
+
 
 app = Flask(__name__)
+app.json = JSONProvider(app)
 
 # it enables the cors and allows requests from any origin
 CORS(app, resources={r'/api/v1/*': {'origins': '0.0.0.0'}})
@@ -35,6 +62,15 @@ def not_found(error):
     return jsonify(response), 404
 
 
+# this handles writes the database refuses, such as a second user with
+# the same email
+@app.errorhandler(IntegrityError)
+def conflict(error):
+    """this returns json response with Conflict message"""
+    response = {"error": "Conflict"}
+    return jsonify(response), 409
+
+
 if __name__ == '__main__':
     # getting the host and port from the environment variables
     HOST = getenv('HBNB_API_HOST', '0.0.0.0')
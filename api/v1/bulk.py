@@ -0,0 +1,51 @@
+#!/usr/bin/python3
+"""this script holds the helper of the bulk creation endpoints
+
+A bulk endpoint takes a JSON array of the dictionaries its single-object
+POST takes, checks all of them first, then stores every object with one
+storage.bulk_new() call: one write of the JSON file, or one INSERT per
+class and one commit in the database."""
+
+from flask import abort, jsonify, request
+from models import storage
+
+
+def bulk_create(cls, required, defaults=None, check=None):
+    """this method creates a cls object from every dictionary of the
+    request array, each holding the required keys, updated with defaults
+    and passed to check before anything is stored"""
+    if not request.is_json:
+        abort(400, 'Not a JSON')
+    data = request.get_json()
+    if type(data) is not list:
+        abort(400, 'Not a JSON array')
+    objs = []
+    for kwargs in data:
+        if type(kwargs) is not dict:
+            abort(400, 'Not a JSON')
+        for key in required:
+            if key not in kwargs:
+                abort(400, 'Missing ' + key)
+        kwargs.update(defaults or {})
+        if check:
+            check(kwargs)
+        objs.append(cls(**kwargs))
+    storage.bulk_new(objs)
+    return jsonify([obj.to_dict() for obj in objs]), 201
+
+
+def existing(cls, key):
+    """this method returns a check aborting with 404 when the kwargs[key]
+    object of cls does not exist, looking each id up once"""
+    found = set()
+
+    def check(kwargs):
+        """this method looks the kwargs[key] object up"""
+        if not isinstance(kwargs[key], str):
+            # no object has such an id, as the single-object POST finds
+            abort(404)
+        if kwargs[key] not in found:
+            if not storage.get(cls, kwargs[key]):
+                abort(404)
+            found.add(kwargs[key])
+    return check
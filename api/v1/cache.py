@@ -0,0 +1,296 @@
+#!/usr/bin/python3
+"""this script holds the response cache of the read endpoints
+
+A cached view names the tags its response depends on: a class name
+("State") for a whole collection, a key ("State.<id>") for one object,
+or "<Class>:<attribute>=<value>" ("City:state_id=<id>") for the children
+of an object. Whenever the storage engine reports that an object changed,
+every response tagged with its class, its key or one of its references
+is dropped, so a read never outlives the write that made it stale.
+
+HBNB_CACHE turns the cache on: "local" keeps it in this process, "shared"
+keeps it in a store several workers can use (see SharedCache). It holds
+up to HBNB_CACHE_SIZE responses (default 1024) for at most HBNB_CACHE_TTL
+seconds (default 60), which also bounds how long a write made outside
+this API (the console, another host) can go unnoticed."""
+
+from collections import OrderedDict
+from functools import wraps
+from api.v1.conditional import revalidate
+from flask import Response, make_response, request
+from models import storage
+from os import getenv
+import threading
+import time
+from urllib.parse import urlencode
+import uuid
+
+
+def tags_of(obj):
+    """this method returns the tags a change to obj invalidates"""
+    if obj is None:
+        return {'*'}
+    name = type(obj).__name__
+    tags = {name, name + '.' + obj.id}
+    for attr, value in vars(obj).items():
+        if attr.endswith('_id') and type(value) is str:
+            tags.add('{}:{}={}'.format(name, attr, value))
+    return tags
+
+
+class LocalCache:
+    """an LRU cache of responses with a time to live, in this process"""
+
+    def __init__(self, size=1024, ttl=60):
+        """this method creates an empty cache"""
+        self.size = size
+        self.ttl = ttl
+        self.__lock = threading.Lock()
+        # key -> (expiry, tags, value), least recently used first
+        self.__entries = OrderedDict()
+        # tag -> keys of the entries depending on it
+        self.__tagged = {}
+        # tag -> tick of its last invalidation, for the latest ones only
+        self.__recent = OrderedDict()
+        self.__tick = 0
+        # tick of the newest invalidation dropped from __recent
+        self.__forgotten = 0
+        self.counters = dict.fromkeys(('hits', 'misses', 'stores',
+                                       'skipped', 'invalidations',
+                                       'evictions'), 0)
+
+    def token(self, tags):
+        """this method returns what set() needs to tell whether the tags
+        were invalidated while the response was being built"""
+        return self.__tick
+
+    def get(self, key):
+        """this method returns the value cached under key, or None"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry and entry[0] < time.monotonic():
+                self.__drop(key)
+                entry = None
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return entry[2]
+
+    def set(self, key, value, tags, token):
+        """this method caches value under key, unless one of its tags was
+        invalidated since token was taken"""
+        tags = set(tags) | {'*'}
+        with self.__lock:
+            if token < self.__forgotten or \
+                    any(self.__recent.get(tag, 0) > token for tag in tags):
+                self.counters['skipped'] += 1
+                return
+            self.__drop(key)
+            self.__entries[key] = (time.monotonic() + self.ttl, tags, value)
+            for tag in tags:
+                self.__tagged.setdefault(tag, set()).add(key)
+            self.counters['stores'] += 1
+            while len(self.__entries) > self.size:
+                self.__drop(next(iter(self.__entries)))
+                self.counters['evictions'] += 1
+
+    def invalidate(self, tags):
+        """this method drops every entry depending on one of the tags"""
+        with self.__lock:
+            self.__tick += 1
+            for tag in tags:
+                self.__recent.pop(tag, None)
+                self.__recent[tag] = self.__tick
+                for key in list(self.__tagged.get(tag, ())):
+                    self.__drop(key)
+            while len(self.__recent) > self.size:
+                self.__forgotten = self.__recent.popitem(last=False)[1]
+            self.counters['invalidations'] += 1
+
+    def stats(self):
+        """this method returns the counters and the number of entries"""
+        with self.__lock:
+            return dict(self.counters, entries=len(self.__entries),
+                        backend='local')
+
+    def __drop(self, key):
+        """this method removes the entry under key and its tag links"""
+        entry = self.__entries.pop(key, None)
+        if entry:
+            for tag in entry[1]:
+                keys = self.__tagged.get(tag)
+                keys.discard(key)
+                if not keys:
+                    del self.__tagged[tag]
+
+
+class MemoryStore:
+    """a key-value store with expiry standing in, in this process, for a
+    memcached or redis client: get(), set(), add() and delete()"""
+
+    def __init__(self, size=1024):
+        """this method creates an empty store"""
+        self.size = size
+        self.__lock = threading.Lock()
+        self.__data = OrderedDict()
+
+    def get(self, key):
+        """this method returns the value under key, or None"""
+        with self.__lock:
+            item = self.__data.get(key)
+            if item is None or (item[0] and item[0] < time.monotonic()):
+                self.__data.pop(key, None)
+                return None
+            self.__data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl=None):
+        """this method stores value under key for ttl seconds"""
+        with self.__lock:
+            self.__data.pop(key, None)
+            self.__data[key] = (ttl and time.monotonic() + ttl, value)
+            while len(self.__data) > self.size:
+                self.__data.popitem(last=False)
+
+    def add(self, key, value, ttl=None):
+        """this method stores value under key unless it holds one"""
+        if self.get(key) is None:
+            self.set(key, value, ttl)
+
+    def delete(self, key):
+        """this method removes the value under key"""
+        with self.__lock:
+            self.__data.pop(key, None)
+
+
+class SharedCache:
+    """a cache of responses kept in a store shared by several workers
+
+    Invalidating a tag gives it a new random version in the store; each
+    entry records the versions of its tags when its response was built,
+    and is only served while they are all still current. A worker thus
+    sees the invalidations of the others without being told about them,
+    and an evicted version can never come back as a stale match."""
+
+    def __init__(self, store, ttl=60):
+        """this method creates a cache over store"""
+        self.store = store
+        self.ttl = ttl
+        self.counters = dict.fromkeys(('hits', 'misses', 'stores',
+                                       'skipped', 'invalidations'), 0)
+
+    def __versions(self, tags):
+        """this method returns the current version of each tag, giving
+        one to the tags that have none"""
+        versions = []
+        for tag in tags:
+            version = self.store.get('tag:' + tag)
+            if version is None:
+                self.store.add('tag:' + tag, uuid.uuid4().hex)
+                version = self.store.get('tag:' + tag)
+            versions.append(version)
+        return versions
+
+    def token(self, tags):
+        """this method returns the versions of the tags"""
+        return self.__versions(sorted(set(tags) | {'*'}))
+
+    def get(self, key):
+        """this method returns the value cached under key, or None"""
+        entry = self.store.get('entry:' + key)
+        if entry is not None and self.__versions(entry[0]) == entry[1]:
+            self.counters['hits'] += 1
+            return entry[2]
+        self.counters['misses'] += 1
+        return None
+
+    def set(self, key, value, tags, token):
+        """this method caches value under key with the tag versions the
+        response was built from"""
+        tags = sorted(set(tags) | {'*'})
+        if self.__versions(tags) != token:
+            self.counters['skipped'] += 1
+            return
+        self.store.set('entry:' + key, (tags, token, value), self.ttl)
+        self.counters['stores'] += 1
+
+    def invalidate(self, tags):
+        """this method gives each tag a new version"""
+        for tag in tags:
+            self.store.set('tag:' + tag, uuid.uuid4().hex)
+        self.counters['invalidations'] += 1
+
+    def stats(self):
+        """this method returns the counters of this worker"""
+        return dict(self.counters, backend='shared')
+
+
+def make_cache():
+    """this method returns the cache HBNB_CACHE asks for, or None"""
+    backend = getenv('HBNB_CACHE', '')
+    size = int(getenv('HBNB_CACHE_SIZE', 1024))
+    ttl = float(getenv('HBNB_CACHE_TTL', 60))
+    if backend == 'local':
+        return LocalCache(size, ttl)
+    if backend == 'shared':
+        return SharedCache(MemoryStore(size * 8), ttl)
+    return None
+
+
+cache = make_cache()
+
+
+def use_cache(new_cache):
+    """this method replaces the cache the views use (None disables it)"""
+    global cache
+    cache = new_cache
+
+
+def stats():
+    """this method returns the statistics of the cache, or None if it is
+    turned off"""
+    return cache.stats() if cache is not None else None
+
+
+def invalidate(obj):
+    """this method drops the responses depending on obj"""
+    if cache is not None:
+        cache.invalidate(tags_of(obj))
+
+
+storage.subscribe(invalidate)
+
+# the headers a cached response is replayed with
+kept_headers = ('Content-Type', 'X-Next-Cursor', 'Link', 'ETag',
+                'Last-Modified')
+
+
+def cached(*tags):
+    """this method caches the 200 responses of a GET view under its path
+    and query arguments; tags are formatted with the view arguments"""
+    def decorator(view):
+        """this method wraps view"""
+        @wraps(view)
+        def wrapper(**kwargs):
+            """this method serves the response from the cache if it can"""
+            if cache is None or request.method != 'GET':
+                return view(**kwargs)
+            key = request.path + '?' + urlencode(
+                sorted(request.args.items(multi=True)))
+            entry = cache.get(key)
+            if entry is not None:
+                body, headers = entry
+                return revalidate(Response(body, 200, headers))
+            names = [tag.format(**kwargs) for tag in tags]
+            token = cache.token(names)
+            response = make_response(view(**kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                headers = [(name, response.headers[name])
+                           for name in kept_headers
+                           if name in response.headers]
+                cache.set(key, (response.get_data(), headers), names, token)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+"""this script holds the helpers that answer conditional GET requests
+
+A single object is validated by its key and updated_at, a collection by
+the latest updated_at and the number of its objects, which the storage
+engine returns without loading them (see freshness()). A request whose
+If-None-Match shows the client copy is current gets an empty 304 before
+anything is converted or serialized. If-Modified-Since is only honoured
+for single objects: deleting an object of a collection does not move
+its latest updated_at. Validators are as precise as the stored
+timestamps."""
+
+from datetime import timezone
+from flask import Response, request
+from hashlib import sha1
+from models.base_model import isoformat
+
+
+class Validators:
+    """the ETag and Last-Modified of a response"""
+
+    def __init__(self, text, last_modified=None, by_date=True):
+        """this method derives the ETag from text"""
+        self.etag = sha1(text.encode()).hexdigest()
+        self.last_modified = last_modified
+        self.by_date = by_date
+
+    def current(self):
+        """this method tells whether the client copy is still current"""
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(self.etag)
+        if self.by_date and self.last_modified and \
+                request.if_modified_since:
+            return self.last_modified.replace(
+                microsecond=0, tzinfo=timezone.utc) <= \
+                request.if_modified_since
+        return False
+
+    def not_modified(self):
+        """this method returns an empty 304 response"""
+        return self.apply(Response(status=304))
+
+    def apply(self, response):
+        """this method adds the ETag and Last-Modified headers to response"""
+        response.set_etag(self.etag)
+        if self.last_modified:
+            response.last_modified = self.last_modified.replace(
+                tzinfo=timezone.utc)
+        return response
+
+
+def for_object(obj):
+    """this method returns the validators of a single object"""
+    return Validators('{}.{}|{}'.format(type(obj).__name__, obj.id,
+                                        isoformat(obj.updated_at)),
+                      obj.updated_at)
+
+
+def for_collection(freshness):
+    """this method returns the validators of a collection, from the
+    (latest updated_at, count) pair freshness() returned for it; the
+    query arguments are part of the ETag so every page has its own"""
+    latest, count = freshness
+    return Validators('{}|{}|{}'.format(request.full_path,
+                                        latest and isoformat(latest), count),
+                      latest, by_date=False)
+
+
+def revalidate(response):
+    """this method returns an empty 304 in place of a stored response
+    whose ETag the request already holds"""
+    etag = response.get_etag()[0]
+    if etag and request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers=[
+            (name, response.headers[name])
+            for name in ('ETag', 'Last-Modified')
+            if name in response.headers])
+    return response
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""this script holds the helpers that page collection endpoints with the
+'limit' and 'cursor' query arguments
+
+A cursor is the (created_at, id) pair of the last object of a page,
+encoded for use in a url; the storage engines resume right after it."""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from flask import abort, request
+from models.base_model import isoformat
+from urllib.parse import urlencode
+
+
+def page_args():
+    """this method returns the (limit, after) pair asked for by the
+    request, where after is the (created_at, id) pair of its cursor"""
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is not None:
+        # isdigit() alone accepts digits such as "²" that int() refuses
+        if not limit.isascii() or not limit.isdigit() or int(limit) < 1:
+            abort(400, 'Invalid limit')
+        limit = int(limit)
+    after = None
+    if cursor:
+        try:
+            text = urlsafe_b64decode(cursor.encode()).decode()
+            created_at, id = text.split('|', 1)
+            after = (datetime.fromisoformat(created_at), id)
+        except (TypeError, ValueError):
+            abort(400, 'Invalid cursor')
+        if after[0].tzinfo is not None:
+            # the stored dates are naive and do not compare with it
+            abort(400, 'Invalid cursor')
+    return limit, after
+
+
+def encode_cursor(obj):
+    """this method returns the cursor resuming right after obj"""
+    text = isoformat(obj.created_at) + '|' + obj.id
+    return urlsafe_b64encode(text.encode()).decode()
+
+
+def with_next_page(response, objs, limit):
+    """this method adds the cursor of the next page to response, in the
+    X-Next-Cursor and Link headers, when objs filled a whole page"""
+    if limit and len(objs) == limit:
+        cursor = encode_cursor(objs[-1])
+        args = request.args.copy()
+        args['cursor'] = cursor
+        response.headers['X-Next-Cursor'] = cursor
+        response.headers['Link'] = '<{}?{}>; rel="next"'.format(
+            request.base_url, urlencode(list(args.items(multi=True))))
+    return response
@@ -0,0 +1,33 @@
+#!/usr/bin/python3
+"""this script holds the helpers that let list endpoints stream their
+JSON array instead of building the whole body before sending it
+
+Streaming is opt-in with the 'stream' query argument; the storage engines
+then hand back an iterator (a server-side cursor in DBStorage), and each
+object is converted and written out as soon as it is read."""
+
+from flask import Response, current_app, request, stream_with_context
+
+
+def wants_stream():
+    """this method tells whether the request asked for a streamed body"""
+    return request.args.get('stream', '').lower() in ('1', 'true')
+
+
+def stream_list(objs, convert=None):
+    """this method returns a response streaming the JSON array of the
+    dictionaries of objs, each passed through convert when given"""
+    dumps = current_app.json.dumps
+
+    def generate():
+        """this method yields the array one object at a time"""
+        yield '['
+        for i, obj in enumerate(objs):
+            obj_dict = obj.to_dict()
+            if convert:
+                obj_dict = convert(obj_dict)
+            yield (',\n' if i else '\n') + dumps(obj_dict)
+        yield '\n]\n'
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/json')
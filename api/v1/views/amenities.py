@@ -6,24 +6,44 @@ from flask import abort, jsonify, request
 from models import storage
 from models.amenity import Amenity
 from api.v1.views import app_views
+from api.v1.bulk import bulk_create
+from api.v1.cache import cached
+from api.v1.conditional import for_collection, for_object
+from api.v1.pagination import page_args, with_next_page
+from api.v1.streaming import stream_list, wants_stream
 
 
 # it handles the url for retrieving all Amenity objects
 @app_views.route('/amenities', methods=['GET'], strict_slashes=False)
+@cached('Amenity')
 def get_all_amenities():
     """this method retrieves all the amenities in storage"""
-    amenities = storage.all(Amenity).values()
-    return jsonify([amenity.to_dict() for amenity in amenities])
+    limit, after = page_args()
+    validators = for_collection(storage.freshness(Amenity))
+    if validators.current():
+        return validators.not_modified()
+    if wants_stream():
+        return validators.apply(
+            stream_list(storage.page(Amenity, limit, after, stream=True)))
+    amenities = storage.page(Amenity, limit, after)
+    return validators.apply(
+        with_next_page(jsonify([amenity.to_dict()
+                                for amenity in amenities]),
+                       amenities, limit))
 
 
 # it handles the url for retrieving an amenity obj by its id
 @app_views.route('/amenities/<amenity_id>', methods=['GET'],
                  strict_slashes=False)
+@cached('Amenity.{amenity_id}')
 def get_amenity(amenity_id):
     """this method retrieves a single amenity obj"""
     amenity = storage.get(Amenity, amenity_id)
     if amenity:
-        return jsonify(amenity.to_dict())
+        validators = for_object(amenity)
+        if validators.current():
+            return validators.not_modified()
+        return validators.apply(jsonify(amenity.to_dict()))
     else:
         abort(404)
 
@@ -60,6 +80,14 @@ def create_amenity():
     return jsonify(amenity.to_dict()), 201
 
 
+# it handles the url for creating many amenity objects at once
+@app_views.route('/amenities/bulk', methods=['POST'], strict_slashes=False)
+def create_amenities():
+    """this method creates an amenity from every dictionary of the JSON
+    array and saves them to storage at once"""
+    return bulk_create(Amenity, ['name'])
+
+
 # it handles the url for updating an amenity object by its id
 @app_views.route('/amenities/<amenity_id>', methods=['PUT'],
                  strict_slashes=False)
@@ -7,11 +7,15 @@ from models.state import State
 from models.city import City
 from models import storage
 from api.v1.views import app_views
+from api.v1.bulk import bulk_create
+from api.v1.cache import cached
+from api.v1.conditional import for_collection, for_object
 
 
 # it handles the url for retrieving all City objects of a state
 @app_views.route('/states/<state_id>/cities', methods=['GET'],
                  strict_slashes=False)
+@cached('State.{state_id}', 'City:state_id={state_id}')
 def get_cities_by_state(state_id):
     """this method retrieves the list of all city objects of a state"""
     state = storage.get(State, state_id)
@@ -19,18 +23,25 @@ def get_cities_by_state(state_id):
     if not state:
         abort(404)
 
+    validators = for_collection(storage.freshness(City, state_id=state_id))
+    if validators.current():
+        return validators.not_modified()
     # getting all the cities in the state and covert it to dictionaries
     cities = [city.to_dict() for city in state.cities]
-    return jsonify(cities)
+    return validators.apply(jsonify(cities))
 
 
 # it handles the url for retrieving a single city by its id
 @app_views.route('/cities/<city_id>', methods=['GET'], strict_slashes=False)
+@cached('City.{city_id}')
 def get_city(city_id):
     """it retrieves a single city obj"""
     city = storage.get(City, city_id)
     if city:
-        return jsonify(city.to_dict())
+        validators = for_object(city)
+        if validators.current():
+            return validators.not_modified()
+        return validators.apply(jsonify(city.to_dict()))
     else:
         abort(404)
 
@@ -76,6 +87,17 @@ def create_city(state_id):
     return jsonify(city.to_dict()), 201
 
 
+# it handles the url for creating many cities under a state at once
+@app_views.route('/states/<state_id>/cities/bulk', methods=['POST'],
+                 strict_slashes=False)
+def create_cities(state_id):
+    """this method creates a city under the state from every dictionary
+    of the JSON array and saves them to storage at once"""
+    if not storage.get(State, state_id):
+        abort(404)
+    return bulk_create(City, ['name'], {'state_id': state_id})
+
+
 # it handles the url for updating an existing city object by id
 @app_views.route('/cities/<city_id>', methods=['PUT'], strict_slashes=False)
 def update_city(city_id):
@@ -4,6 +4,7 @@
 
 from flask import jsonify
 from api.v1.views import app_views
+from api.v1.cache import cached, stats as cache_stats
 from models import storage
 
 
@@ -16,6 +17,7 @@ def api_status():
 
 # it handles the /stats url path
 @app_views.route('/stats', methods=['GET'])
+@cached('Amenity', 'City', 'Place', 'Review', 'State', 'User')
 def get_stats():
     """this method retrieves the number of individual objects by type"""
     stats = {
@@ -27,3 +29,11 @@ def get_stats():
             "users": storage.count('User')
             }
     return jsonify(stats)
+
+
+# it handles the /metrics url path
+@app_views.route('/metrics', methods=['GET'])
+def get_metrics():
+    """this method returns the counters of the response cache and of the
+    database connection pool"""
+    return jsonify({"cache": cache_stats(), "pool": storage.pool_stats()})
@@ -6,34 +6,53 @@ from flask import abort, jsonify, request
 from models import storage
 from models.user import User
 from models.city import City
+from models.engine.columns import ranges
+from models.engine.geo import distance_km
 from models.place import Place
-from models.state import State
-from models.amenity import Amenity
 from api.v1.views import app_views
+from api.v1.bulk import bulk_create, existing
+from api.v1.cache import cached
+from api.v1.conditional import for_collection, for_object
+from api.v1.pagination import page_args, with_next_page
+from api.v1.streaming import stream_list, wants_stream
 
 
 # it handles the url for retrieving all place objects of a city
 @app_views.route('/cities/<city_id>/places', methods=['GET'],
                  strict_slashes=False)
+@cached('City.{city_id}', 'Place:city_id={city_id}')
 def get_places_by_city(city_id):
     """this method retrieves all the place of a city in storage"""
     city = storage.get(City, city_id)
     if not city:
         abort(404)
-    # get all places objects of the city and convert it to dictionaries
-    places = [place.to_dict() for place in city.places]
+    # get a page of the places of the city and convert it to dictionaries
+    limit, after = page_args()
+    validators = for_collection(storage.freshness(Place, city_id=city_id))
+    if validators.current():
+        return validators.not_modified()
+    if wants_stream():
+        return validators.apply(
+            stream_list(storage.page(Place, limit, after, stream=True,
+                                     city_id=city_id)))
+    objs = storage.page(Place, limit, after, city_id=city_id)
+    places = [place.to_dict() for place in objs]
 
-    return jsonify(places)
+    return validators.apply(with_next_page(jsonify(places), objs, limit))
 
 
 # it handles the url for retrieving an place obj by its id
 @app_views.route('/places/<place_id>', methods=['GET'],
                  strict_slashes=False)
+@cached('Place.{place_id}')
 def get_place(place_id):
     """this method retrieves a single place obj"""
     place = storage.get(Place, place_id)
     if place:
-        return jsonify(place.to_dict())
+        validators = for_object(place)
+        if validators.current():
+            return validators.not_modified()
+        return validators.apply(jsonify(place.to_dict()))
     else:
         abort(404)
 
@@ -84,6 +103,18 @@ def create_place(city_id):
     return jsonify(place.to_dict()), 201
 
 
+# it handles the url for creating many places in a city at once
+@app_views.route('/cities/<city_id>/places/bulk', methods=['POST'],
+                 strict_slashes=False)
+def create_places(city_id):
+    """this method creates a place in the city from every dictionary of
+    the JSON array and saves them to storage at once"""
+    if not storage.get(City, city_id):
+        abort(404)
+    return bulk_create(Place, ['name', 'user_id'], {'city_id': city_id},
+                       existing(User, 'user_id'))
+
+
 # it handles the url for updating a place object by its id
 @app_views.route('/places/<place_id>', methods=['PUT'],
                  strict_slashes=False)
@@ -133,65 +164,112 @@ def places_search():
         abort(400, description="Not a JSON")
 
     # get the data from the given json body
-    data = request.get_json()
-
-    # get the criteria from the data
-    if data and len(data):
-        states = data.get('states', None)
-        cities = data.get('cities', None)
-        amenities = data.get('amenities', None)
-
-    # retrieve all places if no criteria given
-    if not data or not len(data) or (not states and not
-                                     cities and not amenities):
-        places = storage.all(Place).values()
-        list_places = []
-        # change each place object to a dictionary and join it to the list
-        for place in places:
-            list_places.append(place.to_dict())
-
-        return jsonify(list_places)
-
-    # creating a list to store the filtered places based on criteria provided
-    list_places = []
-
-    # retrives filtered places based on states criteria
-    if states:
-        states_obj = [storage.get(State, st_id) for st_id in states]
-        # loop thru individual state object
-        for state in states_obj:
-            if state:
-                # loop thru individual city in the state's cities list
-                for city in state.cities:
-                    if city:
-                        for place in city.places:
-                            # append the place to the list of filtered places
-                            list_places.append(place)
-
-    # filtering places based on cities criteria
-    if cities:
-        city_obj = [storage.get(City, ct_id) for ct_id in cities]
-        for city in city_obj:
-            if city:
-                for place in city.places:
-                    if place not in list_places:
-                        list_places.append(place)
-
-    # filter places based on amenities criteria
-    if amenities:
-        # retrieve all place objects from storage if list_places is empty
-        if not list_places:
-            list_places = storage.all(Place).values()
-        amenities_obj = [storage.get(Amenity, am_id) for am_id in amenities]
-        list_places = [place for place in list_places
-                       if all([am in place.amenities for am in amenities_obj])]
+    data = request.get_json() or {}
+    limit, after = page_args()
+    geo = geo_criteria(data)
+    q = data.get('q')
+    if q is not None and (type(q) is not str or not q.strip()):
+        abort(400, description='Invalid q')
+    ranked = 'near' in geo or q is not None
+    if ranked and after:
+        # near and q pages are cut by distance or relevance, which a
+        # cursor cannot resume
+        abort(400, description='Invalid cursor')
+
+    # the storage engine resolves the states, cities and amenities
+    # criteria in one pass instead of walking every relationship here,
+    # the numeric ranges over its columns of place attributes and q over
+    # its index of their words
+    list_places = storage.search_places(**id_criteria(data),
+                                        limit=limit, after=after,
+                                        stream=wants_stream(), q=q,
+                                        **range_criteria(data), **geo)
+    convert = without_amenities
+    if 'near' in geo:
+        convert = with_distance(*geo['near'][:2])
+    if wants_stream():
+        return stream_list(list_places, convert)
 
     # preparing the final list of places for response
     places = []
     for plc in list_places:
-        dt = plc.to_dict()
-        # remove the amenities key from the dictionary
-        dt.pop('amenities', None)
-        places.append(dt)
-
-    return jsonify(places)
+        places.append(convert(plc.to_dict()))
+
+    if ranked:
+        return jsonify(places)
+    return with_next_page(jsonify(places), list_places, limit)
+
+
+def without_amenities(place_dict):
+    """this method removes the amenities key from a place dictionary"""
+    place_dict.pop('amenities', None)
+    return place_dict
+
+
+def id_criteria(data):
+    """this method returns the states, cities and amenities criteria of a
+    search, aborting if one is not a list of ids"""
+    criteria = {}
+    for name in ('states', 'cities', 'amenities'):
+        ids = data.get(name)
+        if ids is not None and (type(ids) is not list or
+                                not all(type(i) is str for i in ids)):
+            abort(400, description=name + ' must be a list of ids')
+        criteria[name] = ids
+    return criteria
+
+
+def range_criteria(data):
+    """this method returns the price_min, price_max, min_guests and
+    min_rooms criteria of a search, aborting if one is not a number"""
+    criteria = {}
+    for name in ranges:
+        if data.get(name) is None:
+            continue
+        if not is_number(data[name]):
+            abort(400, description=name + ' must be a number')
+        criteria[name] = data[name]
+    return criteria
+
+
+def is_number(value):
+    """this method tells whether a JSON value is a number"""
+    return type(value) in (int, float)
+
+
+def geo_criteria(data):
+    """this method returns the near (lat, lng, radius_km) and bbox (west,
+    south, east, north) criteria of a search, aborting if one is not
+    made of valid coordinates"""
+    criteria = {}
+    near = data.get('near')
+    if near is not None:
+        if type(near) is not dict:
+            abort(400, description='Invalid near')
+        near = tuple(near.get(name) for name in ('lat', 'lng', 'radius_km'))
+        if not all(map(is_number, near)) or not -90 <= near[0] <= 90 or \
+                not -180 <= near[1] <= 180 or near[2] <= 0:
+            abort(400, description='Invalid near')
+        criteria['near'] = near
+    bbox = data.get('bbox')
+    if bbox is not None:
+        if type(bbox) is not list or len(bbox) != 4 or \
+                not all(map(is_number, bbox)) or \
+                not all(-180 <= bbox[i] <= 180 for i in (0, 2)) or \
+                not -90 <= bbox[1] <= bbox[3] <= 90:
+            abort(400, description='Invalid bbox')
+        criteria['bbox'] = tuple(bbox)
+    return criteria
+
+
+def with_distance(lat, lng):
+    """this method returns a converter removing the amenities key of a
+    place dictionary and adding its distance_km from (lat, lng)"""
+    def convert(place_dict):
+        """this method converts one place dictionary"""
+        place_dict = without_amenities(place_dict)
+        place_dict['distance_km'] = round(distance_km(
+            lat, lng, place_dict.get('latitude', 0.0),
+            place_dict.get('longitude', 0.0)), 3)
+        return place_dict
+    return convert
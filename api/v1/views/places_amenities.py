@@ -9,6 +9,7 @@ from models.user import User
 from models.place import Place
 from models.review import Review
 from api.v1.views import app_views
+from api.v1.cache import cached
 # from flasgger.utils import swag_from
 from os import environ
 
@@ -18,6 +19,7 @@ from os import environ
                  strict_slashes=False)
 # @swag_from('documentation/place_amenity/get_places_amenities.yml',
 # methods=['GET'])
+@cached('Place.{place_id}', 'Amenity')
 def get_place_amenities(place_id):
     """this method retrieves all the amenity obj of a place in storage"""
     place = storage.get(Place, place_id)
@@ -56,7 +58,9 @@ def delete_place_amenity(place_id, amenity_id):
             abort(404)
         place.amenity_ids.remove(amenity_id)
 
-    storage.save()
+    # save() moves updated_at, so the ETag of the place changes with its
+    # amenities
+    place.save()
     return make_response(jsonify({}), 200)
 
 
@@ -87,5 +91,7 @@ def post_place_amenity(place_id, amenity_id):
         else:
             place.amenity_ids.append(amenity_id)
 
-    storage.save()
+    # save() moves updated_at, so the ETag of the place changes with its
+    # amenities
+    place.save()
     return make_response(jsonify(amenity.to_dict()), 201)
@@ -8,30 +8,64 @@ from models.user import User
 from models.place import Place
 from models.review import Review
 from api.v1.views import app_views
+from api.v1.bulk import bulk_create, existing
+from api.v1.cache import cached
+from api.v1.conditional import for_collection, for_object
+from api.v1.pagination import page_args, with_next_page
+from api.v1.streaming import stream_list, wants_stream
 
 
 # it handles the url for retrieving all Review objects of a place
 @app_views.route('/places/<place_id>/reviews', methods=['GET'],
                  strict_slashes=False)
+@cached('Place.{place_id}', 'Review:place_id={place_id}')
 def get_reviews_by_place(place_id):
     """this method retrieves all the review of a place in storage"""
     place = storage.get(Place, place_id)
     if not place:
         abort(404)
-    # get all reviews objects of the place and convert it to dictionaries
-    reviews = [review.to_dict() for review in place.reviews]
-
-    return jsonify(reviews)
+    # get a page of the reviews of the place and convert it to dictionaries
+    limit, after = page_args()
+    q = request.args.get('q')
+    if q is not None and not q.strip():
+        abort(400, description='Invalid q')
+    if q is not None and after:
+        # q pages are cut by relevance, which a cursor cannot resume
+        abort(400, description='Invalid cursor')
+    validators = for_collection(storage.freshness(Review,
+                                                  place_id=place_id))
+    if validators.current():
+        return validators.not_modified()
+    if q is not None:
+        # the reviews holding a word of q, best match first
+        objs = storage.search(Review, q, limit, stream=wants_stream(),
+                              place_id=place_id)
+        if wants_stream():
+            return validators.apply(stream_list(objs))
+        return validators.apply(jsonify([review.to_dict()
+                                         for review in objs]))
+    if wants_stream():
+        return validators.apply(
+            stream_list(storage.page(Review, limit, after, stream=True,
+                                     place_id=place_id)))
+    objs = storage.page(Review, limit, after, place_id=place_id)
+    reviews = [review.to_dict() for review in objs]
+
+    return validators.apply(with_next_page(jsonify(reviews), objs, limit))
 
 
 # it handles the url for retrieving a review obj by its id
 @app_views.route('/reviews/<review_id>', methods=['GET'],
                  strict_slashes=False)
+@cached('Review.{review_id}')
 def get_review(review_id):
     """this method retrieves a single review obj"""
     review = storage.get(Review, review_id)
     if review:
-        return jsonify(review.to_dict())
+        validators = for_object(review)
+        if validators.current():
+            return validators.not_modified()
+        return validators.apply(jsonify(review.to_dict()))
     else:
         abort(404)
 
@@ -84,6 +118,18 @@ def create_review(place_id):
     return jsonify(review.to_dict()), 201
 
 
+# it handles the url for creating many reviews of a place at once
+@app_views.route('/places/<place_id>/reviews/bulk', methods=['POST'],
+                 strict_slashes=False)
+def create_reviews(place_id):
+    """this method creates a review of the place from every dictionary of
+    the JSON array and saves them to storage at once"""
+    if not storage.get(Place, place_id):
+        abort(404)
+    return bulk_create(Review, ['text', 'user_id'], {'place_id': place_id},
+                       existing(User, 'user_id'))
+
+
 # it handles the url for updating a review object by its id
 @app_views.route('/reviews/<review_id>', methods=['PUT'],
                  strict_slashes=False)
@@ -5,25 +5,43 @@ all default RESTful API actions(get,post,put,delete,update)"""
 from flask import abort, jsonify, request
 from models.state import State
 from api.v1.views import app_views
+from api.v1.bulk import bulk_create
+from api.v1.cache import cached
+from api.v1.conditional import for_collection, for_object
+from api.v1.pagination import page_args, with_next_page
+from api.v1.streaming import stream_list, wants_stream
 from models import storage
 
 
 # this handles the url that retrieves all states in storage
 @app_views.route('/states', methods=['GET'], strict_slashes=False)
+@cached('State')
 def get_all_states():
     """this method retrieves the list of all state object"""
-    states = storage.all(State).values()
+    limit, after = page_args()
+    validators = for_collection(storage.freshness(State))
+    if validators.current():
+        return validators.not_modified()
+    if wants_stream():
+        return validators.apply(
+            stream_list(storage.page(State, limit, after, stream=True)))
+    states = storage.page(State, limit, after)
     state_list = [state.to_dict() for state in states]
-    return jsonify(state_list)
+    return validators.apply(
+        with_next_page(jsonify(state_list), states, limit))
 
 
 # this handles the url for retrieving a specific state by id
 @app_views.route('/states/<state_id>', methods=['GET'], strict_slashes=False)
+@cached('State.{state_id}')
 def get_state(state_id):
     """this method retrieves a single state object"""
     state = storage.get(State, state_id)
     if state:
-        return jsonify(state.to_dict())
+        validators = for_object(state)
+        if validators.current():
+            return validators.not_modified()
+        return validators.apply(jsonify(state.to_dict()))
     else:
         abort(404)
 
@@ -59,6 +77,14 @@ def create_state():
     return jsonify(state.to_dict()), 201
 
 
+# this handles the url for creating many state objects at once
+@app_views.route('/states/bulk', methods=['POST'], strict_slashes=False)
+def create_states():
+    """this method creates a state object from every dictionary of the
+    JSON array and saves them to storage at once"""
+    return bulk_create(State, ['name'])
+
+
 # this handles the url for updating a state object
 @app_views.route('/states/<state_id>', methods=['PUT'], strict_slashes=False)
 def update_state(state_id):
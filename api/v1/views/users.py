@@ -6,24 +6,43 @@ from flask import abort, jsonify, request
 from models import storage
 from models.user import User
 from api.v1.views import app_views
+from api.v1.bulk import bulk_create
+from api.v1.cache import cached
+from api.v1.conditional import for_collection, for_object
+from api.v1.pagination import page_args, with_next_page
+from api.v1.streaming import stream_list, wants_stream
 
 
 # it handles the url for retrieving all User objects
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
+@cached('User')
 def get_all_users():
     """this method retrieves all the users in storage"""
-    users = storage.all(User).values()
-    return jsonify([user.to_dict() for user in users])
+    limit, after = page_args()
+    validators = for_collection(storage.freshness(User))
+    if validators.current():
+        return validators.not_modified()
+    if wants_stream():
+        return validators.apply(
+            stream_list(storage.page(User, limit, after, stream=True)))
+    users = storage.page(User, limit, after)
+    return validators.apply(
+        with_next_page(jsonify([user.to_dict() for user in users]),
+                       users, limit))
 
 
 # it handles the url for retrieving an user obj by its id
 @app_views.route('/users/<user_id>', methods=['GET'],
                  strict_slashes=False)
+@cached('User.{user_id}')
 def get_user(user_id):
     """this method retrieves a single user obj"""
     user = storage.get(User, user_id)
     if user:
-        return jsonify(user.to_dict())
+        validators = for_object(user)
+        if validators.current():
+            return validators.not_modified()
+        return validators.apply(jsonify(user.to_dict()))
     else:
         abort(404)
 
@@ -62,6 +81,14 @@ def create_user():
     return jsonify(user.to_dict()), 201
 
 
+# it handles the url for creating many user objects at once
+@app_views.route('/users/bulk', methods=['POST'], strict_slashes=False)
+def create_users():
+    """this method creates an user from every dictionary of the JSON
+    array and saves them to storage at once"""
+    return bulk_create(User, ['email', 'password'])
+
+
 # it handles the url for updating an user object by its id
 @app_views.route('/users/<user_id>', methods=['PUT'],
                  strict_slashes=False)
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Measures the "places having all of these amenities" filter of
+places_search on generated places.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_amenities [places] [amenities]
+
+Defaults to 1,000,000 places and 50 amenities; amenity i is held by
+2% to 42% of the places, rising with i, so each place has about eleven.
+Each query is answered three ways: testing every place's amenity_ids
+(what places_search did first), intersecting the reverse index
+FileStorage keeps on Place.amenity_ids, and ANDing the bitsets of the
+BitmapIndex FileStorage now uses for several amenities (one is still
+answered from the reverse index). "city" restricts the search to 200
+places first, as a cities criterion does.
+"""
+
+import random
+import sys
+import timeit
+from models.engine import columns
+from models.engine.bitmaps import BitmapIndex
+
+
+def make_places(count, amenities):
+    """returns (key, amenity_ids) pairs of `count` generated places"""
+    rng = random.Random(0)
+    odds = [0.02 + 0.4 * i / max(1, amenities - 1) for i in range(amenities)]
+    return [("Place.{}".format(n),
+             [str(i) for i in range(amenities) if rng.random() < odds[i]])
+            for n in range(count)]
+
+
+def scan(places, wanted, keys=None):
+    """tests the amenity_ids of every place"""
+    return [key for key, amenity_ids in places
+            if (keys is None or key in keys) and
+            all(amenity in amenity_ids for amenity in wanted)]
+
+
+def intersect(index, wanted, keys=None):
+    """intersects the reverse index, as FileStorage did before bitmaps"""
+    for amenity in wanted:
+        having = index.get(amenity, {})
+        if keys is None:
+            keys = dict(having)
+        else:
+            keys = {key: None for key in keys if key in having}
+    return list(keys)
+
+
+def timed(function):
+    """returns the best of three runs of function, in milliseconds"""
+    return min(timeit.repeat(function, number=1, repeat=3)) * 1000
+
+
+def main(count, amenities):
+    """prints the milliseconds each way takes per query"""
+    places = make_places(count, amenities)
+    index = {}
+    bitmaps = BitmapIndex()
+    for key, amenity_ids in places:
+        for amenity in amenity_ids:
+            index.setdefault(amenity, {})[key] = None
+        bitmaps.set(key, amenity_ids)
+    city = dict.fromkeys(key for key, _ in random.Random(1).sample(
+        places, 200))
+    last = str(amenities - 1)
+    queries = (("rare", ["0"], None), ("common", [last], None),
+               ("rare+common", ["0", last], None),
+               ("3 common", [str(amenities - 3), str(amenities - 2), last],
+                None),
+               ("city+2", [str(amenities // 2), last], city))
+    size = sum(len(bitset) for bitset in bitmaps.bitsets.values())
+    print("{} places, {} amenities, bitsets {:.1f} MB, numpy {}".format(
+        count, amenities, size / 1e6, columns.numpy is not None))
+    print("{:>12} {:>9} {:>10} {:>14} {:>11}".format(
+        "query", "places", "scan ms", "intersect ms", "bitmap ms"))
+    for name, wanted, keys in queries:
+        found = bitmaps.select(wanted, keys)
+        assert sorted(found) == sorted(intersect(index, wanted, keys))
+        print("{:>12} {:>9} {:>10.1f} {:>14.1f} {:>11.1f}".format(
+            name, len(found),
+            timed(lambda: scan(places, wanted, keys)),
+            timed(lambda: intersect(index, wanted, keys)),
+            timed(lambda: bitmaps.select(wanted, keys))))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""
+Measures storage.get() latency as the number of stored objects grows.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_get [max_objects]
+
+The lookup should stay flat: get() resolves "<Class>.<id>" directly
+instead of scanning every object of the class.
+"""
+
+import sys
+import timeit
+from models import storage
+from models.review import Review
+
+LOOKUPS = 10000
+
+
+def fill(count, ids):
+    """adds Review objects to storage until it holds `count` of them"""
+    while len(ids) < count:
+        review = Review(place_id="bench", user_id="bench", text="bench")
+        storage.new(review)
+        ids.append(review.id)
+
+
+def main(max_objects):
+    """prints the mean get() latency for growing dataset sizes"""
+    ids = []
+    size = 1000
+    print("{:>10} {:>14}".format("objects", "get() usec"))
+    while size <= max_objects:
+        fill(size, ids)
+        target = ids[len(ids) // 2]
+        seconds = timeit.timeit(lambda: storage.get(Review, target),
+                                number=LOOKUPS)
+        print("{:>10} {:>14.3f}".format(size, seconds / LOOKUPS * 1e6))
+        size *= 10
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
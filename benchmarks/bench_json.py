@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+"""
+Measures serialization throughput of each installed JSON backend on the
+Place and Review records FileStorage and the API write.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_json [records]
+
+Each backend dumps the records one by one, as FileStorage writes its
+snapshot lines, and as one list, as a list endpoint responds; then it
+loads them back. HBNB_JSON selects which one the application uses.
+"""
+
+import sys
+import timeit
+from models.engine import serializer
+from models.place import Place
+from models.review import Review
+
+
+def make_records(count):
+    """returns `count` to_dict() records, one place per ten reviews"""
+    records = []
+    for i in range(count):
+        if i % 11 == 0:
+            obj = Place(city_id="bench", user_id="bench",
+                        name="Place {}".format(i), description="x" * 200,
+                        number_rooms=3, number_bathrooms=2, max_guest=6,
+                        price_by_night=120, latitude=37.77,
+                        longitude=-122.41)
+        else:
+            obj = Review(place_id="bench", user_id="bench", text="y" * 200)
+        records.append(obj.to_dict())
+    return records
+
+
+def main(count):
+    """prints records per second for each backend and operation"""
+    records = make_records(count)
+    print("{:>8} {:>16} {:>16} {:>16} {:>8}".format(
+        "backend", "dumps rec/s", "dumps list rec/s", "loads rec/s", "MB"))
+    for name in serializer.available():
+        dumps, loads = serializer.backend(name)
+        texts = [dumps(record) for record in records]
+        size = sum(len(text.encode()) for text in texts) / 1e6
+        one = min(timeit.repeat(lambda: [dumps(r) for r in records],
+                                number=1, repeat=3))
+        whole = min(timeit.repeat(lambda: dumps(records),
+                                  number=1, repeat=3))
+        back = min(timeit.repeat(lambda: [loads(t) for t in texts],
+                                 number=1, repeat=3))
+        print("{:>8} {:>16,.0f} {:>16,.0f} {:>16,.0f} {:>8.1f}".format(
+            name, count / one, count / whole, count / back, size))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
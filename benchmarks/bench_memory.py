@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+Measures the memory FileStorage holds per object after reload().
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_memory [objects]
+
+The fixture of bench_reload (mostly reviews, one place per twenty) is
+reloaded in a fresh interpreter under tracemalloc, once building every
+object and once with HBNB_FILE_LAZY=1, where the records stay raw JSON
+text until all() builds them. Bytes per object count everything reload()
+allocated: the model objects, their attributes and the indexes
+FileStorage keeps over them.
+"""
+
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from benchmarks.bench_reload import make_fixture
+
+
+def load(directory):
+    """child process: reloads file.json from directory and reports"""
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as empty:
+        os.chdir(empty)
+        from models import storage
+    os.chdir(directory)
+    gc.collect()
+    tracemalloc.start()
+    storage.reload()
+    gc.collect()
+    loaded = tracemalloc.get_traced_memory()[0]
+    storage.all()
+    gc.collect()
+    built = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    os.chdir(root)
+    print(json.dumps({"objects": storage.count(), "loaded": loaded,
+                      "built": built}))
+
+
+def measure(directory, lazy=False):
+    """runs load() in a fresh interpreter and returns its report"""
+    env = dict(os.environ, PYTHONPATH=os.getcwd(),
+               HBNB_FILE_LAZY="1" if lazy else "0")
+    env.pop("HBNB_TYPE_STORAGE", None)
+    out = subprocess.check_output([sys.executable, "-m",
+                                   "benchmarks.bench_memory", "--load",
+                                   directory], env=env)
+    return json.loads(out)
+
+
+def main(count):
+    """writes the fixture and prints the bytes held per object"""
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        make_fixture(count).compact()
+        os.chdir(root)
+        print("{:>8} {:>10} {:>18} {:>18}".format(
+            "mode", "objects", "B/obj reloaded", "B/obj built"))
+        for name, lazy in (("eager", False), ("lazy", True)):
+            report = measure(directory, lazy)
+            print("{:>8} {:>10} {:>18,.0f} {:>18,.0f}".format(
+                name, report["objects"],
+                report["loaded"] / report["objects"],
+                report["built"] / report["objects"]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--load":
+        load(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Measures FileStorage.reload() time and peak RSS on a generated fixture.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_reload [objects]
+
+The fixture is written twice in a temporary directory: once in the
+line-per-record snapshot layout, which reload() streams, and once as a
+single-line JSON document, which reload() has to parse whole. Each file
+is loaded in a fresh interpreter so the peak RSS of one load does not
+hide the other. The per-line file is also loaded with HBNB_FILE_LAZY=1,
+where reload() only keeps the raw record text.
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def make_fixture(count):
+    """fills storage with `count` objects, mostly reviews"""
+    from models import storage
+    from models.place import Place
+    from models.review import Review
+    places = []
+    for i in range(max(1, count // 20)):
+        place = Place(city_id="bench", user_id="bench",
+                      name="Place {}".format(i), description="x" * 200)
+        storage.new(place)
+        places.append(place.id)
+    for i in range(count - len(places)):
+        storage.new(Review(place_id=places[i % len(places)],
+                           user_id="bench", text="y" * 200))
+    return storage
+
+
+def load(directory):
+    """child process: reloads file.json from directory and reports"""
+    os.chdir(directory)
+    start = time.perf_counter()
+    from models import storage
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"objects": storage.count(), "seconds": seconds,
+                      "peak_rss_kb": peak}))
+
+
+def measure(directory, lazy=False):
+    """runs load() in a fresh interpreter and returns its report"""
+    env = dict(os.environ, PYTHONPATH=os.getcwd(),
+               HBNB_FILE_LAZY="1" if lazy else "0")
+    env.pop("HBNB_TYPE_STORAGE", None)
+    out = subprocess.check_output([sys.executable, "-m",
+                                   "benchmarks.bench_reload", "--load",
+                                   directory], env=env)
+    return json.loads(out)
+
+
+def main(count):
+    """writes the fixture in both layouts and compares their reloads"""
+    root = os.getcwd()
+    with tempfile.TemporaryDirectory() as streamed, \
+            tempfile.TemporaryDirectory() as whole:
+        os.chdir(streamed)
+        storage = make_fixture(count)
+        storage.compact()
+        os.chdir(whole)
+        with open("file.json", "w") as f:
+            json.dump({key: obj.to_dict()
+                       for key, obj in storage.all().items()}, f)
+        os.chdir(root)
+        print("{:>12} {:>10} {:>10} {:>14}".format(
+            "layout", "objects", "seconds", "peak RSS MB"))
+        for name, directory, lazy in (("per-line", streamed, False),
+                                      ("single-line", whole, False),
+                                      ("lazy", streamed, True)):
+            report = measure(directory, lazy)
+            print("{:>12} {:>10} {:>10.2f} {:>14.1f}".format(
+                name, report["objects"], report["seconds"],
+                report["peak_rss_kb"] / 1024))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--load":
+        load(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
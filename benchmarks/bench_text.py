@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""
+Measures the q criterion of places_search on generated places.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_text [places]
+
+Defaults to 100,000 places with 2 word names and descriptions of 20 to
+120 words, drawn from a 20,000 word vocabulary with Zipf's law as
+natural text roughly is. Each query is answered by tokenizing every
+place and scoring the ones holding a word (what a search without an
+index has to do), and by the BM25 ranking of the TextIndex FileStorage
+keeps; "city" restricts the search to 200 places first, as a cities
+criterion does.
+"""
+
+import random
+import sys
+import time
+import timeit
+from models.engine.text import TextIndex, tokenize
+
+
+class Doc:
+    """a generated place holding only what the index reads"""
+
+    def __init__(self, name, description):
+        """this method creates the place"""
+        self.name = name
+        self.description = description
+
+
+def make_places(count, words=20000):
+    """returns (key, Doc) pairs of `count` generated places"""
+    rng = random.Random(0)
+    vocabulary = ["w{}".format(rank) for rank in range(words)]
+    weights = [1 / (rank + 1) for rank in range(words)]
+    return [("Place.{}".format(n),
+             Doc(*(" ".join(rng.choices(vocabulary, weights, k=size))
+                   for size in (2, rng.randint(20, 120)))))
+            for n in range(count)]
+
+
+def scan(places, query, keys=None):
+    """tokenizes every description and returns the keys holding a word of
+    query, most matching words first"""
+    words = set(tokenize(query))
+    found = []
+    for key, doc in places:
+        if keys is None or key in keys:
+            held = len(words.intersection(tokenize(doc.name) +
+                                          tokenize(doc.description)))
+            if held:
+                found.append((-held, key))
+    found.sort()
+    return [key for _, key in found]
+
+
+def timed(function):
+    """returns the best of three runs of function, in milliseconds"""
+    return min(timeit.repeat(function, number=1, repeat=3)) * 1000
+
+
+def main(count):
+    """prints the milliseconds each way takes per query"""
+    places = make_places(count)
+    index = TextIndex(("name", "description"))
+    start = time.perf_counter()
+    for key, doc in places:
+        index.set(key, doc)
+    built = time.perf_counter() - start
+    city = dict.fromkeys(key for key, _ in random.Random(1).sample(
+        places, 200))
+    queries = (("rare", "w15000", None), ("common", "w3", None),
+               ("rare+common", "w15000 w3", None),
+               ("3 words", "w40 w400 w4000", None),
+               ("city+2", "w40 w400", city))
+    print("{} places, {} words, index built in {:.1f} s".format(
+        count, len(index.postings), built))
+    print("{:>12} {:>9} {:>10} {:>10}".format(
+        "query", "places", "scan ms", "index ms"))
+    for name, query, keys in queries:
+        found = index.search(query, keys)
+        assert {key for _, key in found} == set(scan(places, query, keys))
+        print("{:>12} {:>9} {:>10.1f} {:>10.1f}".format(
+            name, len(found), timed(lambda: scan(places, query, keys)),
+            timed(lambda: index.search(query, keys))))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+Measures the per-object cost of building a model from a stored record and
+of to_dict(), next to the strptime/strftime calls they used to make.
+
+Usage (from the repository root):
+    python3 -m benchmarks.bench_timestamps [rounds]
+"""
+
+from datetime import datetime
+import sys
+import timeit
+from models.base_model import isoformat, time
+from models.review import Review
+
+
+def report(label, seconds, rounds):
+    """prints the mean cost of one call in microseconds"""
+    print("{:<34} {:>8.3f} usec".format(label, seconds / rounds * 1e6))
+
+
+def main(rounds):
+    """times construction and to_dict() of a Review"""
+    record = Review(place_id="bench", user_id="bench",
+                    text="bench").to_dict()
+    review = Review(**record)
+    stamp = record["created_at"]
+    now = datetime.utcnow()
+    report("Review(**record)",
+           timeit.timeit(lambda: Review(**record), number=rounds), rounds)
+    report("review.to_dict()",
+           timeit.timeit(review.to_dict, number=rounds), rounds)
+    report("datetime.strptime(stamp, time)",
+           timeit.timeit(lambda: datetime.strptime(stamp, time),
+                         number=rounds), rounds)
+    report("datetime.fromisoformat(stamp)",
+           timeit.timeit(lambda: datetime.fromisoformat(stamp),
+                         number=rounds), rounds)
+    report("now.strftime(time)",
+           timeit.timeit(lambda: now.strftime(time), number=rounds), rounds)
+    report("isoformat(now)",
+           timeit.timeit(lambda: isoformat(now), number=rounds), rounds)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
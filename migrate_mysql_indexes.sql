@@ -0,0 +1,76 @@
+-- adds the indexes declared by the models to a database created before
+-- them (new databases get them from Base.metadata.create_all)
+-- usage: cat migrate_mysql_indexes.sql | mysql -uroot -p hbnb_dev_db
+-- it can be run again: existing indexes are left alone. InnoDB drops the
+-- indexes it created by itself for a foreign key once one of these
+-- covers it.
+-- The first FULLTEXT index of a table rebuilds it to add the FTS_DOC_ID
+-- column InnoDB keys its word index on.
+-- ix_users_email is unique: list the emails used twice first with
+--   SELECT email, COUNT(*) FROM users GROUP BY email HAVING COUNT(*) > 1;
+
+DROP PROCEDURE IF EXISTS hbnb_add_index;
+DELIMITER //
+CREATE PROCEDURE hbnb_add_index(tbl VARCHAR(64), idx VARCHAR(64),
+                                definition VARCHAR(255))
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM information_schema.statistics
+                   WHERE table_schema = DATABASE() AND table_name = tbl
+                   AND index_name = idx) THEN
+        SET @ddl = CONCAT('ALTER TABLE `', tbl, '` ADD ', definition);
+        PREPARE statement FROM @ddl;
+        EXECUTE statement;
+        DEALLOCATE PREPARE statement;
+    END IF;
+END //
+DELIMITER ;
+
+CALL hbnb_add_index('amenities', 'ix_amenities_created_at',
+                    'INDEX ix_amenities_created_at (created_at)');
+CALL hbnb_add_index('amenities', 'ix_amenities_updated_at',
+                    'INDEX ix_amenities_updated_at (updated_at)');
+CALL hbnb_add_index('states', 'ix_states_created_at',
+                    'INDEX ix_states_created_at (created_at)');
+CALL hbnb_add_index('states', 'ix_states_updated_at',
+                    'INDEX ix_states_updated_at (updated_at)');
+CALL hbnb_add_index('users', 'ix_users_created_at',
+                    'INDEX ix_users_created_at (created_at)');
+CALL hbnb_add_index('users', 'ix_users_updated_at',
+                    'INDEX ix_users_updated_at (updated_at)');
+CALL hbnb_add_index('users', 'ix_users_email',
+                    'UNIQUE INDEX ix_users_email (email)');
+CALL hbnb_add_index('cities', 'ix_cities_created_at',
+                    'INDEX ix_cities_created_at (created_at)');
+CALL hbnb_add_index('cities', 'ix_cities_updated_at',
+                    'INDEX ix_cities_updated_at (updated_at)');
+CALL hbnb_add_index('cities', 'ix_cities_state_id',
+                    'INDEX ix_cities_state_id (state_id)');
+CALL hbnb_add_index('places', 'ix_places_created_at',
+                    'INDEX ix_places_created_at (created_at)');
+CALL hbnb_add_index('places', 'ix_places_updated_at',
+                    'INDEX ix_places_updated_at (updated_at)');
+CALL hbnb_add_index('places', 'ix_places_user_id',
+                    'INDEX ix_places_user_id (user_id)');
+CALL hbnb_add_index('places', 'ix_places_city_id_price_by_night',
+                    'INDEX ix_places_city_id_price_by_night '
+                    '(city_id, price_by_night)');
+CALL hbnb_add_index('places', 'ix_places_latitude_longitude',
+                    'INDEX ix_places_latitude_longitude '
+                    '(latitude, longitude)');
+CALL hbnb_add_index('places', 'ix_places_fulltext',
+                    'FULLTEXT INDEX ix_places_fulltext (name, description)');
+CALL hbnb_add_index('place_amenity', 'ix_place_amenity_amenity_id',
+                    'INDEX ix_place_amenity_amenity_id (amenity_id, place_id)');
+CALL hbnb_add_index('reviews', 'ix_reviews_created_at',
+                    'INDEX ix_reviews_created_at (created_at)');
+CALL hbnb_add_index('reviews', 'ix_reviews_updated_at',
+                    'INDEX ix_reviews_updated_at (updated_at)');
+CALL hbnb_add_index('reviews', 'ix_reviews_user_id',
+                    'INDEX ix_reviews_user_id (user_id)');
+CALL hbnb_add_index('reviews', 'ix_reviews_place_id_created_at',
+                    'INDEX ix_reviews_place_id_created_at '
+                    '(place_id, created_at)');
+CALL hbnb_add_index('reviews', 'ix_reviews_fulltext',
+                    'FULLTEXT INDEX ix_reviews_fulltext (text)');
+
+DROP PROCEDURE hbnb_add_index;
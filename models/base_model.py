@@ -3,7 +3,7 @@
 Contains class BaseModel
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 import models
 from os import getenv
 import hashlib
@@ -14,6 +14,32 @@ import uuid
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
 
+
+def isoformat(value):
+    """formats a datetime like value.strftime(time), several times faster;
+    a datetime with a UTC offset is written as naive UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    text = value.isoformat()
+    return text if value.microsecond else text + ".000000"
+
+
+def parse_time(text):
+    """parses text written in the time format, several times faster than
+    datetime.strptime(text, time), which still rejects any other text
+
+    A text with a UTC offset ("Z", "+01:00", or the "+00:00.000000" an
+    earlier isoformat() wrote) is kept as naive UTC, like the dates the
+    models make with utcnow(), so dates always compare."""
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    if len(text) != 26 or text[10] != "T" or text[19] != ".":
+        # "2020-01-01", "2020-01-01 00:00:00", ...
+        return datetime.strptime(text, time)
+    return value
+
+
 if models.storage_t == "db":
     Base = declarative_base()
 else:
@@ -24,25 +50,42 @@ class BaseModel:
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.utcnow)
-        updated_at = Column(DateTime, default=datetime.utcnow)
+        # InnoDB appends the primary key to secondary indexes, so these
+        # serve the (created_at, id) keyset pages and MAX(updated_at)
+        created_at = Column(DateTime, default=datetime.utcnow, index=True)
+        updated_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
         if kwargs:
-            for key, value in kwargs.items():
-                if key != "__class__":
-                    setattr(self, key, value)
-            if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
+            # id and the dates are set first, in the order the no-argument
+            # branch sets them, so CPython keeps one table of attribute
+            # names for all the instances of a class (PEP 412) instead of
+            # giving each a dictionary of its own
+            self.id = kwargs.get("id", None)
+            if self.id is None:
+                self.id = str(uuid.uuid4())
+            created_at = kwargs.get("created_at", None)
+            if not created_at or type(created_at) is not str:
+                created_at = None
+            updated_at = kwargs.get("updated_at", None)
+            if not updated_at or type(updated_at) is not str:
+                updated_at = None
+            if created_at:
+                self.created_at = parse_time(created_at)
             else:
                 self.created_at = datetime.utcnow()
-            if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
+            if updated_at == created_at:
+                # a new object, or one never updated, holds one datetime
+                self.updated_at = self.created_at
+            elif updated_at:
+                self.updated_at = parse_time(updated_at)
             else:
                 self.updated_at = datetime.utcnow()
-            if kwargs.get("id", None) is None:
-                self.id = str(uuid.uuid4())
+            for key, value in kwargs.items():
+                if key not in ("__class__", "id", "created_at",
+                               "updated_at"):
+                    setattr(self, key, value)
         else:
             self.id = str(uuid.uuid4())
             self.created_at = datetime.utcnow()
@@ -63,12 +106,15 @@ class BaseModel:
         """returns a dictionary containing all keys/values of the instance"""
         new_dict = self.__dict__.copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            new_dict["created_at"] = isoformat(new_dict["created_at"])
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+            new_dict["updated_at"] = isoformat(new_dict["updated_at"])
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
+            # relationships loaded eagerly or lazily hold model objects
+            for name in self.__mapper__.relationships.keys():
+                new_dict.pop(name, None)
 
         # Hash the password to MD5 value if it exists
         if save_f is None:
@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""
+Contains BitmapIndex, the bitmaps FileStorage keeps of the amenities of
+its places
+
+Every place gets an ordinal, and every amenity a bitset holding the bits
+of the ordinals of the places that have it. The bitsets are bytearrays,
+so adding or removing a place flips a bit in place. "The places having
+all of A, B and C" is then the AND of three integers read from the
+bitsets; the places a state or city criterion left are turned into one
+more integer and ANDed the same way. The ordinal of a deleted place goes
+to the next new one, so the bitsets stay as long as the largest number
+of places held at once.
+"""
+
+import re
+from models.engine.columns import numpy
+
+# byte value -> positions of its set bits
+_bits = [tuple(bit for bit in range(8) if byte >> bit & 1)
+         for byte in range(256)]
+_nonzero = re.compile(b"[^\x00]")
+
+
+class BitmapIndex:
+    """one bitset of place ordinals per value of a list attribute"""
+
+    def __init__(self):
+        """this method creates an empty index"""
+        # list - key of the place given each ordinal, None once it is free
+        self.keys = []
+        # dictionary - key of each place mapped to its ordinal
+        self.ordinals = {}
+        # list - ordinals freed by removed places
+        self.free = []
+        # dictionary - key of each place mapped to the values it is
+        # filed under
+        self.values = {}
+        # dictionary - value mapped to the bitset of its places
+        self.bitsets = {}
+
+    def __len__(self):
+        """this method returns the number of places indexed"""
+        return len(self.ordinals)
+
+    def set(self, key, values):
+        """this method files the place stored under key under values,
+        leaving out the ones that are not strings"""
+        values = tuple(value for value in values if type(value) is str)
+        old = self.values.get(key)
+        if old == values:
+            return
+        ordinal = self.ordinals.get(key)
+        if ordinal is None:
+            if self.free:
+                ordinal = self.free.pop()
+                self.keys[ordinal] = key
+            else:
+                ordinal = len(self.keys)
+                self.keys.append(key)
+            self.ordinals[key] = ordinal
+        else:
+            self.__flip(ordinal, old, False)
+        self.values[key] = values
+        self.__flip(ordinal, values, True)
+
+    def remove(self, key):
+        """this method drops the place stored under key"""
+        ordinal = self.ordinals.pop(key, None)
+        if ordinal is None:
+            return
+        self.__flip(ordinal, self.values.pop(key), False)
+        self.keys[ordinal] = None
+        self.free.append(ordinal)
+
+    def select(self, values, keys=None):
+        """this method returns the keys of the places filed under every
+        one of values, only among keys when it is given"""
+        if keys is not None and len(keys) << 6 < len(self.keys):
+            # a few places: test their bits rather than mask them all
+            bitsets = [self.bitsets.get(value, b"") for value in values]
+            found = []
+            for key in keys:
+                ordinal = self.ordinals.get(key)
+                if ordinal is not None and all(
+                        len(bitset) > ordinal >> 3 and
+                        bitset[ordinal >> 3] >> (ordinal & 7) & 1
+                        for bitset in bitsets):
+                    found.append(key)
+            return found
+        found = None if keys is None else self.mask(keys)
+        for value in values:
+            bitset = int.from_bytes(self.bitsets.get(value, b""), "little")
+            found = bitset if found is None else found & bitset
+            if not found:
+                return []
+        if found is None:
+            return [key for key in self.keys if key is not None]
+        return [self.keys[ordinal] for ordinal in self.ordinals_of(found)]
+
+    def mask(self, keys):
+        """this method returns the bits of the ordinals of keys"""
+        bits = bytearray((len(self.keys) + 7) >> 3)
+        for key in keys:
+            ordinal = self.ordinals.get(key)
+            if ordinal is not None:
+                bits[ordinal >> 3] |= 1 << (ordinal & 7)
+        return int.from_bytes(bits, "little")
+
+    @staticmethod
+    def ordinals_of(bits):
+        """this method returns the ordinals whose bits are set"""
+        data = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+        if numpy is not None:
+            return numpy.flatnonzero(numpy.unpackbits(
+                numpy.frombuffer(data, dtype=numpy.uint8),
+                bitorder="little")).tolist()
+        if bits.bit_count() < len(data) >> 3:
+            # few places left: let the regex engine skip the zero bytes
+            return [match.start() << 3 | bit
+                    for match in _nonzero.finditer(data)
+                    for bit in _bits[data[match.start()]]]
+        return [index << 3 | bit for index, byte in enumerate(data) if byte
+                for bit in _bits[byte]]
+
+    def __flip(self, ordinal, values, on):
+        """this method sets or clears the bit of ordinal in the bitsets
+        of values"""
+        byte, bit = ordinal >> 3, 1 << (ordinal & 7)
+        for value in values:
+            bitset = self.bitsets.setdefault(value, bytearray())
+            if len(bitset) <= byte:
+                # grown by half again, so a stream of new places does not
+                # copy the bitset each time
+                bitset.extend(bytes(max(byte + 1, len(bitset) * 3 // 2) -
+                                    len(bitset)))
+            if on:
+                bitset[byte] |= bit
+            else:
+                bitset[byte] &= ~bit & 0xFF
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+"""
+Contains PlaceColumns, the columnar copy FileStorage keeps of the numeric
+attributes of its places
+
+Every attribute is one array of floats with a row per place, so a range
+filter over all the places is a pass over contiguous memory rather than
+a getattr() per object. NumPy evaluates the filters when it is installed
+(HBNB_NUMPY=0 turns it off), the array module and a comprehension do
+otherwise. A value that is not a number is kept as NaN, which no range
+matches. The API serves requests from several threads, so the columns
+are read and written under a lock.
+"""
+
+from array import array
+import math
+import operator
+from os import getenv
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+if getenv("HBNB_NUMPY") == "0":
+    numpy = None
+
+fields = ("number_rooms", "number_bathrooms", "max_guest",
+          "price_by_night", "latitude", "longitude")
+# places_search criterion -> (attribute, comparison the places must pass
+# against the criterion value); DBStorage applies the same to its columns
+ranges = {"price_min": ("price_by_night", operator.ge),
+          "price_max": ("price_by_night", operator.le),
+          "min_guests": ("max_guest", operator.ge),
+          "min_rooms": ("number_rooms", operator.ge)}
+
+
+def number(value):
+    """returns value as a float, or NaN if it is not a number"""
+    if type(value) is bool:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class PlaceColumns:
+    """the numeric attributes of a set of places, one array per attribute"""
+
+    def __init__(self):
+        """this method creates an empty store"""
+        # list - key of the place in each row
+        self.keys = []
+        # dictionary - key of each place mapped to its row
+        self.rows = {}
+        self.columns = {field: array("d") for field in fields}
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """this method returns the number of places stored"""
+        return len(self.keys)
+
+    def set(self, key, obj):
+        """this method stores the attributes of the place obj under key"""
+        values = [number(getattr(obj, field, None)) for field in fields]
+        with self.__lock:
+            row = self.rows.get(key)
+            if row is None:
+                self.rows[key] = len(self.keys)
+                self.keys.append(key)
+                for field, value in zip(fields, values):
+                    self.columns[field].append(value)
+            else:
+                for field, value in zip(fields, values):
+                    self.columns[field][row] = value
+
+    def remove(self, key):
+        """this method drops the place stored under key, moving the last
+        row into its place"""
+        with self.__lock:
+            row = self.rows.pop(key, None)
+            if row is None:
+                return
+            last = self.keys.pop()
+            for column in self.columns.values():
+                value = column.pop()
+                if row < len(self.keys):
+                    column[row] = value
+            if row < len(self.keys):
+                self.keys[row] = last
+                self.rows[last] = row
+
+    def select(self, keys=None, **criteria):
+        """this method returns the keys of the places passing every
+        criterion, given as the names of ranges mapped to numbers; only
+        the places stored under keys are looked at when it is given"""
+        with self.__lock:
+            return self.__select(keys, criteria)
+
+    def __select(self, keys, criteria):
+        """this method runs select() with the lock held"""
+        if keys is None:
+            rows = range(len(self.keys))
+        else:
+            rows = [self.rows[key] for key in keys if key in self.rows]
+        if numpy is not None and len(rows):
+            if keys is None:
+                rows = numpy.arange(len(self.keys))
+            else:
+                rows = numpy.asarray(rows, dtype=numpy.intp)
+            for name, bound in criteria.items():
+                field, compare = ranges[name]
+                # a view of the array, dropped as soon as it is indexed:
+                # set() and remove() cannot resize an array while a view
+                # of it is alive
+                rows = rows[compare(numpy.frombuffer(
+                    self.columns[field])[rows], bound)]
+            return [self.keys[row] for row in rows.tolist()]
+        for name, bound in criteria.items():
+            field, compare = ranges[name]
+            column = self.columns[field]
+            if type(rows) is range:
+                values = enumerate(column)
+            else:
+                values = zip(rows, map(column.__getitem__, rows))
+            # spelt out rather than through compare(), which would cost a
+            # call per row
+            if compare is operator.ge:
+                rows = [row for row, value in values if value >= bound]
+            else:
+                rows = [row for row, value in values if value <= bound]
+        return [self.keys[row] for row in rows]
@@ -3,23 +3,65 @@
 Contains the class DBStorage
 """
 
+from contextlib import contextmanager
+from datetime import datetime
+import itertools
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine.columns import ranges
+from models.engine.geo import bounding_box, distance_km, lng_spans
+from models.engine.text import searchable
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
+import os
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, event, func, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import joinedload, scoped_session, selectinload
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+import threading
+import time
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
 
+class TimedQueuePool(QueuePool):
+    """a QueuePool that also records how long checkouts wait for a free
+    connection, and how many give up after pool_timeout"""
+
+    def __init__(self, *args, **kwargs):
+        """creates the pool with its wait counters at zero"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        """checks a connection out, timing the wait"""
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sqlalchemy.exc.TimeoutError:
+            with self.__lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self.__lock:
+                self.waits += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
@@ -32,20 +74,45 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        self.__engine = create_engine(
+            'mysql+mysqldb://{}:{}@{}/{}'.format(HBNB_MYSQL_USER,
+                                                 HBNB_MYSQL_PWD,
+                                                 HBNB_MYSQL_HOST,
+                                                 HBNB_MYSQL_DB),
+            poolclass=TimedQueuePool,
+            pool_size=int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+            max_overflow=int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10)),
+            pool_timeout=float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)),
+            # below MySQL's wait_timeout, so idle connections are renewed
+            # before the server drops them
+            pool_recycle=int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+            pool_pre_ping=getenv('HBNB_MYSQL_POOL_PRE_PING', '1') == '1',
+            connect_args={'connect_timeout':
+                          int(getenv('HBNB_MYSQL_CONNECT_TIMEOUT', 10))})
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine)
+        event.listen(self.__engine, "before_cursor_execute", self.__record)
+        # a forked worker (gunicorn) opens its own connections instead of
+        # sharing the sockets of its parent
+        os.register_at_fork(
+            after_in_child=lambda: self.__engine.dispose(close=False))
+        # per-thread depth of the open batch() blocks
+        self.__local = threading.local()
+        # callables told about every object a commit or a call to new()
+        # or delete() touches
+        self.__listeners = []
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, load=None):
+        """query on the current database session, eagerly loading the
+        relationship paths of load (see __options) when cls is given"""
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                query = self.__session.query(classes[clss])
+                if cls is not None:
+                    query = query.options(*self.__options(classes[clss],
+                                                          load))
+                objs = query.all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
@@ -54,20 +121,65 @@ class DBStorage:
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.__notify(obj)
 
     def save(self):
-        """commit all changes of the current database session"""
+        """commit all changes of the current database session, unless a
+        batch() is open in this thread"""
+        if not getattr(self.__local, "depth", 0):
+            self.__commit()
+
+    def __commit(self):
+        """commits the session, then tells the listeners about every
+        object the commit wrote, or None for rows a bulk statement
+        changed without loading them"""
         self.__session.commit()
+        for obj in self.__session.info.pop("changed", []):
+            self.__notify(obj)
+
+    @staticmethod
+    def __collect(session, context, instances):
+        """remembers the objects a flush writes until the next commit"""
+        session.info.setdefault("changed", []).extend(
+            itertools.chain(session.new, session.dirty, session.deleted))
+
+    def subscribe(self, listener):
+        """calls listener with every object new(), delete() or a commit
+        touches from now on"""
+        self.__listeners.append(listener)
+
+    def __notify(self, obj):
+        """tells the listeners that obj changed"""
+        for listener in self.__listeners:
+            listener(obj)
+
+    @contextmanager
+    def batch(self):
+        """defers the commits of every save() made in the block to one
+        commit at its end, rolling the session back if the block fails"""
+        self.__local.depth = getattr(self.__local, "depth", 0) + 1
+        try:
+            yield self
+        except Exception:
+            self.__local.depth -= 1
+            self.__session.rollback()
+            self.__session.info.pop("changed", None)
+            raise
+        self.__local.depth -= 1
+        if not self.__local.depth:
+            self.__commit()
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
+            self.__notify(obj)
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        event.listen(sess_factory, "before_flush", self.__collect)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
@@ -75,20 +187,254 @@ class DBStorage:
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=None):
         """this method retrieves a single object from the file storage by
-        class and id"""
+        class and id, eagerly loading the relationship paths of load"""
         if cls in classes.values() and id and type(id) == str:
-            db_obj = self.all(cls)
-            for key, value in db_obj.items():
-                if key.split(".")[1] == id:
-                    return value
+            # primary key lookup, served from the identity map when loaded
+            return self.__session.get(cls, id,
+                                      options=self.__options(cls, load))
         return None
 
+    def page(self, cls, limit=None, after=None, stream=False, load=None,
+             **where):
+        """returns up to limit objects of cls whose attributes equal the
+        where values, ordered by (created_at, id) and starting after the
+        (created_at, id) pair after; as an iterator if stream is set"""
+        cls = classes.get(cls, cls)
+        query = self.__session.query(cls).filter_by(**where)
+        query = query.options(*self.__options(cls, load))
+        return self.__results(self.__keyset(query, cls, limit, after),
+                              stream)
+
+    def search(self, cls, q, limit=None, stream=False, **where):
+        """returns up to limit objects of cls whose attributes equal the
+        where values and whose text holds a word of q, best match first,
+        ranked by the MySQL FULLTEXT index of the class; as an iterator if
+        stream is set"""
+        cls = classes.get(cls, cls)
+        relevance = self.__relevance(cls, q)
+        query = self.__session.query(cls).filter_by(**where).filter(
+            relevance > 0).order_by(relevance.desc(), cls.id)
+        if limit:
+            query = query.limit(limit)
+        return self.__results(query, stream)
+
+    @staticmethod
+    def __relevance(cls, q):
+        """returns the MATCH ... AGAINST relevance of q to the searchable
+        columns of cls, in natural language mode"""
+        columns = [getattr(cls, field) for field in searchable[cls.__name__]]
+        return match(*columns, against=q).in_natural_language_mode()
+
+    def freshness(self, cls, **where):
+        """returns the latest updated_at and the number of the objects of
+        cls whose attributes equal the where values, in one aggregate
+        query"""
+        cls = classes.get(cls, cls)
+        query = self.__session.query(func.max(cls.updated_at),
+                                     func.count(cls.id))
+        for attr, value in where.items():
+            query = query.filter(getattr(cls, attr) == value)
+        latest, count = query.one()
+        return latest, count
+
+    @staticmethod
+    def __options(cls, load):
+        """returns the loader options for the dotted relationship paths of
+        load, such as "cities" or "cities.places" from State: collections
+        are loaded with one SELECT ... IN per level, many-to-one links are
+        joined into the query that loads their owner"""
+        options = []
+        for path in load or ():
+            option, owner = None, cls
+            for name in path.split("."):
+                attr = getattr(owner, name)
+                strategy = selectinload if attr.property.uselist \
+                    else joinedload
+                if option is None:
+                    option = strategy(attr)
+                else:
+                    option = getattr(option, strategy.__name__)(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
+
+    def bulk_new(self, objs):
+        """inserts objs with one executemany INSERT per class instead of
+        a unit-of-work flush per object, then commits unless a batch() is
+        open; their relationships are not written"""
+        objs = list(objs)
+        by_class = {}
+        for obj in objs:
+            by_class.setdefault(type(obj), []).append(obj)
+        for cls, group in by_class.items():
+            columns = set(cls.__table__.columns.keys())
+            self.__session.bulk_insert_mappings(cls, [
+                {name: value for name, value in vars(obj).items()
+                 if name in columns} for obj in group])
+        self.__session.info.setdefault("changed", []).extend(objs)
+        self.save()
+
+    def bulk_update(self, cls, rows):
+        """updates the rows of cls from the row dictionaries, matched on
+        their id, with one executemany UPDATE, then commits unless a
+        batch() is open"""
+        cls = classes.get(cls, cls)
+        columns = set(cls.__table__.columns.keys()) - {"created_at"}
+        now = datetime.utcnow()
+        mappings = [dict({name: value for name, value in row.items()
+                          if name in columns}, updated_at=now)
+                    for row in rows if row.get("id")]
+        self.__session.flush()
+        self.__session.bulk_update_mappings(cls, mappings)
+        # the objects already loaded re-read their row on next access
+        ids = {mapping["id"] for mapping in mappings}
+        for obj in list(self.__session.identity_map.values()):
+            if type(obj) is cls and obj.id in ids:
+                self.__session.expire(obj)
+        self.__session.info.setdefault("changed", []).append(None)
+        self.save()
+
+    def bulk_delete(self, cls, ids):
+        """deletes the rows of cls with the given ids, 1000 per DELETE,
+        then commits unless a batch() is open"""
+        cls = classes.get(cls, cls)
+        ids = list(ids)
+        for start in range(0, len(ids), 1000):
+            self.__session.query(cls).filter(
+                cls.id.in_(ids[start:start + 1000])).delete(
+                    synchronize_session="evaluate")
+        self.__session.info.setdefault("changed", []).append(None)
+        self.save()
+
+    def pool_stats(self):
+        """returns the state of the connection pool and the waits of its
+        checkouts"""
+        pool = self.__engine.pool
+        stats = {"class": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)()
+        for name in ("waits", "wait_total", "wait_max", "timeouts"):
+            if hasattr(pool, name):
+                stats[name] = getattr(pool, name)
+        return stats
+
+    @contextmanager
+    def statements(self):
+        """records the SQL statements this thread runs in the block in
+        the list it yields, so tests can count the queries of a call"""
+        recorded = []
+        recorders = self.__local.__dict__.setdefault("recorders", [])
+        recorders.append(recorded)
+        try:
+            yield recorded
+        finally:
+            # the blocks of a thread close in the reverse order they open
+            recorders.pop()
+
+    def __record(self, conn, cursor, statement, parameters, context,
+                 executemany):
+        """adds statement to the lists of the open statements() blocks"""
+        for recorded in getattr(self.__local, "recorders", ()):
+            recorded.append(statement)
+
+    def __results(self, query, stream=False):
+        """returns the rows of query as a list, or if stream is set as an
+        iterator fetching them in chunks through a server-side cursor"""
+        if stream:
+            return iter(query.yield_per(1000))
+        return query.all()
+
+    def __keyset(self, query, cls, limit=None, after=None):
+        """orders query by (created_at, id), keeping up to limit rows
+        after the (created_at, id) pair after"""
+        if after:
+            created_at, id = after
+            query = query.filter(or_(cls.created_at > created_at,
+                                     and_(cls.created_at == created_at,
+                                          cls.id > id)))
+        query = query.order_by(cls.created_at, cls.id)
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      limit=None, after=None, stream=False, price_min=None,
+                      price_max=None, min_guests=None, min_rooms=None,
+                      near=None, bbox=None, q=None):
+        """returns the places located in the given states or cities (all
+        places if neither is given) that have every given amenity, pass
+        the price_min, price_max, min_guests and min_rooms bounds and lie
+        inside the (west, south, east, north) bbox, in a single query
+        paged like page() when limit or after is given
+
+        With near, a (lat, lng, radius_km) circle, the query reads the
+        places of the box around it and only those inside it are
+        returned, nearest first; limit keeps the nearest. With q, only the
+        places whose name or description match it in the FULLTEXT index
+        are returned, best match first unless near is given, and limit
+        keeps the best."""
+        from models.place import place_amenity
+        query = self.__session.query(Place)
+        criteria = {"price_min": price_min, "price_max": price_max,
+                    "min_guests": min_guests, "min_rooms": min_rooms}
+        for name, bound in criteria.items():
+            if bound is not None:
+                # with the city_id criteria, served by the (city_id,
+                # price_by_night) index
+                field, compare = ranges[name]
+                query = query.filter(compare(getattr(Place, field), bound))
+        if states or cities:
+            query = query.join(City, Place.city_id == City.id).filter(
+                or_(City.state_id.in_(states or []),
+                    Place.city_id.in_(cities or [])))
+        if amenities:
+            amenities = set(amenities)
+            having_all = select(place_amenity.c.place_id).where(
+                place_amenity.c.amenity_id.in_(amenities)).group_by(
+                place_amenity.c.place_id).having(
+                func.count(place_amenity.c.amenity_id) == len(amenities))
+            query = query.filter(Place.id.in_(having_all))
+        for box in (bbox, near and bounding_box(*near)):
+            if box:
+                query = self.__inside(query, *box)
+        if q is not None:
+            relevance = self.__relevance(Place, q)
+            query = query.filter(relevance > 0)
+            if not near:
+                query = query.order_by(relevance.desc(), Place.id)
+                if limit:
+                    query = query.limit(limit)
+                return self.__results(query, stream)
+        if near:
+            lat, lng, radius_km = near
+            found = sorted((distance_km(lat, lng, place.latitude,
+                                        place.longitude), place.id, place)
+                           for place in query)
+            places = [place for distance, _, place in found
+                      if distance <= radius_km][:limit]
+            return iter(places) if stream else places
+        if limit or after:
+            query = self.__keyset(query, Place, limit, after)
+        return self.__results(query, stream)
+
+    @staticmethod
+    def __inside(query, west, south, east, north):
+        """narrows query down to the places inside the box, through the
+        (latitude, longitude) index"""
+        return query.filter(Place.latitude.between(south, north), or_(*[
+            Place.longitude.between(low, high)
+            for low, high in lng_spans(west, east)]))
+
     def count(self, cls=None):
         """this method returns the number of objects present in the storage
         matching the given class"""
-        data = self.all(cls)
-        if cls in classes.values():
-            data = self.all(cls)
-        return len(data)
+        if cls is None:
+            return sum(self.count(clss) for clss in classes.values())
+        cls = classes.get(cls, cls)
+        if cls not in classes.values():
+            return 0
+        # SELECT COUNT(id) instead of loading every row just to len() it
+        return self.__session.query(func.count(cls.id)).scalar()
@@ -3,19 +3,41 @@
 Contains the FileStorage class
 """
 
+import atexit
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import datetime
+import itertools
 import json
 import models
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine import serializer
+from models.engine.bitmaps import BitmapIndex
+from models.engine.columns import PlaceColumns
+from models.engine.geo import GridIndex
+from models.engine.text import TextIndex, searchable
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
-from hashlib import md5
+from hashlib import md5, sha256
+import os
+from os import getenv
+import shutil
+import sys
+import threading
+import time
 
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
+_decoder = json.JSONDecoder()
+# attributes FileStorage keeps reverse indexes on, by class name, so the
+# children of an object are found without scanning their whole class
+references = {"City": ("state_id",),
+              "Place": ("city_id", "user_id", "amenity_ids"),
+              "Review": ("place_id", "user_id")}
 
 
 class FileStorage:
@@ -25,73 +47,707 @@ class FileStorage:
     __file_path = "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects bucketed by class name, so that
+    # all(cls), count(cls) and get(cls, id) only touch one class
+    __classes = {}
+    # string - the previous snapshot, kept so that reload() can fall back
+    # to it when __file_path fails its checksum
+    __backup_path = "file.json.bak"
+    # bool - set when reload() had to fall back to __backup_path, so the
+    # damaged snapshot is not rotated into its place
+    __damaged = False
+    # string - path to the append-only journal of changes since the
+    # last full write of __file_path
+    __journal_path = "file.json.journal"
+    # bool - when set, save() appends the changed objects to the journal
+    # instead of rewriting __file_path
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1"
+    # integer - journal entries after which save() compacts the journal
+    # back into __file_path
+    __compact_every = int(getenv("HBNB_FILE_COMPACT_EVERY", 1000))
+    # integer - entries currently in the journal
+    __journaled = 0
+    # dictionary - keys changed since the last save, mapped to the object
+    # or to None if it was deleted
+    __dirty = {}
+    # integer - pending changes after which a deferred save() flushes
+    __flush_size = int(getenv("HBNB_FILE_FLUSH_SIZE", 0))
+    # float - seconds after the last flush at which a deferred save()
+    # flushes
+    __flush_interval = float(getenv("HBNB_FILE_FLUSH_INTERVAL", 0))
+    # float - time.monotonic() of the last flush
+    __flushed_at = time.monotonic()
+    # bool - set once the exit handler flushing deferred changes is
+    # registered
+    __exit_flush = False
+    # per-thread depth of the open batch() blocks
+    __local = threading.local()
+    # bool - when set, reload() keeps each record as its raw JSON text
+    # and builds the model object on first access through all() or get()
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    # dictionary - raw JSON text of the records not built yet, bucketed
+    # by class name like __classes
+    __raw = {}
+    # dictionary - (class name, attribute) mapped to the reverse index of
+    # that attribute: value -> keys of the objects holding it
+    __refs = {}
+    # dictionary - key of each indexed object mapped to the values of its
+    # references it was indexed under
+    __ref_of = {}
+    # dictionary - class name mapped to the sorted (created_at, id) pairs
+    # of its objects, built by the first page() over that class
+    __sorted = {}
+    # dictionary - key of each object in __sorted mapped to its pair
+    __sorted_as = {}
+    # tuple - os.stat() signature of the JSON file and the journal when
+    # they were last read or written, so close() can skip a reload
+    __seen = None
+    # PlaceColumns - the numeric attributes of the built places, which
+    # the range criteria of search_places() are evaluated over
+    __columns = PlaceColumns()
+    # BitmapIndex - the built places filed by their amenity_ids, for the
+    # amenities criterion of search_places()
+    __amenities = BitmapIndex()
+    # GridIndex - the built places filed by their latitude and longitude,
+    # for the near and bbox criteria of search_places()
+    __geo = GridIndex()
+    # dictionary - class name mapped to the TextIndex of the text of its
+    # built objects, for search() and the q criterion of search_places()
+    __texts = {name: TextIndex(fields) for name, fields in searchable.items()}
+    # list - callables told about every object new() or delete() touches,
+    # and given None when reload() replaces the objects
+    __listeners = []
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def all(self, cls=None, load=None):
+        """returns the dictionary __objects
+
+        load names the relationships DBStorage should load eagerly; the
+        objects here already reach theirs through the reverse indexes."""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            name = cls if type(cls) is str else cls.__name__
+            self.__build(name)
+            return dict(self.__classes.get(name, {}))
+        for name in list(self.__raw):
+            self.__build(name)
         return self.__objects
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
             key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            self.__put(key, obj)
+            self.__dirty[key] = obj
+            self.__notify(obj)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path)
+
+        The write is deferred while a batch() is open in this thread, or
+        until the HBNB_FILE_FLUSH_SIZE / HBNB_FILE_FLUSH_INTERVAL policy
+        is due when one is configured."""
+        if getattr(self.__local, "depth", 0):
+            return
+        if self.__flush_size or self.__flush_interval:
+            if not FileStorage.__exit_flush:
+                atexit.register(self.__flush_pending)
+                FileStorage.__exit_flush = True
+            waited = time.monotonic() - self.__flushed_at
+            if not (self.__flush_size and
+                    len(self.__dirty) >= self.__flush_size) and \
+                    not (self.__flush_interval and
+                         waited >= self.__flush_interval):
+                return
+        self.flush()
+
+    def flush(self):
+        """writes the pending changes now, to the journal or the JSON file"""
+        if self.__journal and os.path.isfile(self.__file_path) and \
+                self.__journaled + len(self.__dirty) < self.__compact_every:
+            self.__append_journal()
+        else:
+            self.compact()
+        FileStorage.__flushed_at = time.monotonic()
+
+    @contextmanager
+    def batch(self):
+        """defers every save() made in the block to one flush at its end
+
+        If the block raises, nothing it changed is written: like the
+        rollback of DBStorage.batch(), the objects go back to what the
+        JSON file and the journal hold, so the changes a deferred save()
+        left pending are flushed when the outermost block opens.
+
+        The pending changes are shared by every thread, so a save() from
+        another thread writes the block's changes too, and a rollback
+        drops that thread's changes: batch() is only safe in a single
+        thread, such as the console, not under the threaded API."""
+        depth = getattr(self.__local, "depth", 0)
+        if not depth and self.__dirty:
+            self.flush()
+        self.__local.depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            self.__local.depth -= 1
+            if not self.__local.depth:
+                self.__rollback()
+            raise
+        self.__local.depth -= 1
+        if not self.__local.depth:
+            self.flush()
+
+    def __rollback(self):
+        """drops the changes made since the last flush and reloads the
+        objects from the JSON file and the journal"""
+        keys = list(self.__dirty)
+        self.__dirty.clear()
+        for key in keys:
+            # the objects created since are not in the file to reload
+            self.__pop(key)
+        self.reload()
+
+    def __flush_pending(self):
+        """flushes the changes a deferred save() has not written yet"""
+        if self.__dirty:
+            self.flush()
+
+    def compact(self):
+        """writes every object to the JSON file and drops the journal"""
+        built = ((key, serializer.dumps(obj.to_dict()))
+                 for key, obj in self.__objects.items())
+        raw = (item for bucket in self.__raw.values()
+               for item in bucket.items())
+        self.__write_snapshot(itertools.chain(built, raw))
+        if os.path.exists(self.__journal_path):
+            os.remove(self.__journal_path)
+        FileStorage.__journaled = 0
+        FileStorage.__seen = self.__signature()
+        self.__dirty.clear()
 
     def reload(self):
         """deserializes the JSON file to __objects"""
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except Exception:
-            pass
+            objects = self.__read_snapshot(self.__file_path)
+        except ValueError:
+            objects = self.__read_snapshot(self.__backup_path)
+            if objects is None:
+                raise
+            FileStorage.__damaged = True
+        # rebuilt on demand rather than kept sorted one insert at a time
+        self.__sorted.clear()
+        self.__sorted_as.clear()
+        for key, obj in (objects or {}).items():
+            if type(obj) is str:
+                self.__pop(key)
+                self.__raw.setdefault(key.split(".", 1)[0], {})[key] = obj
+            else:
+                self.__load(key, obj)
+        self.__replay_journal()
+        FileStorage.__seen = self.__signature()
+        self.__notify(None)
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            self.__pop(key)
+            self.__dirty[key] = None
+            self.__notify(obj)
+
+    def pool_stats(self):
+        """returns None, there is no connection pool to report on"""
+        return None
+
+    def bulk_new(self, objs):
+        """adds every object of objs and writes them with one save()"""
+        for obj in objs:
+            self.new(obj)
+        self.save()
+
+    def bulk_update(self, cls, rows):
+        """sets the attributes of each row dictionary on the object of cls
+        whose id it holds, and writes them with one save()"""
+        cls = classes.get(cls, cls)
+        now = datetime.utcnow()
+        for row in rows:
+            obj = self.get(cls, row.get("id"))
+            if obj is None:
+                continue
+            for attr, value in row.items():
+                if attr not in ("id", "created_at", "updated_at",
+                                "__class__"):
+                    setattr(obj, attr, value)
+            obj.updated_at = now
+            self.new(obj)
+        self.save()
+
+    def bulk_delete(self, cls, ids):
+        """deletes the objects of cls with the given ids, and writes the
+        change with one save()"""
+        cls = classes.get(cls, cls)
+        for id in ids:
+            obj = self.get(cls, id)
+            if obj is not None:
+                self.delete(obj)
+        self.save()
+
+    @contextmanager
+    def statements(self):
+        """yields the list DBStorage would record its SQL statements in,
+        which stays empty here"""
+        yield []
+
+    def subscribe(self, listener):
+        """calls listener with every object new() or delete() touches
+        from now on, and with None whenever reload() replaces them all"""
+        self.__listeners.append(listener)
+
+    def __notify(self, obj):
+        """tells the listeners that obj changed"""
+        for listener in self.__listeners:
+            listener(obj)
+
+    def related(self, cls, attr, value):
+        """returns the objects of cls whose attr is value, or contains it
+        for a list attribute like Place.amenity_ids"""
+        name = cls if type(cls) is str else cls.__name__
+        if attr not in references.get(name, ()):
+            return [obj for obj in self.all(cls).values()
+                    if getattr(obj, attr, None) == value]
+        self.__build(name)
+        keys = self.__refs.get((name, attr), {}).get(value, {})
+        return [self.__objects[key] for key in keys if key in self.__objects]
+
+    def page(self, cls, limit=None, after=None, stream=False, load=None,
+             **where):
+        """returns up to limit objects of cls whose attributes equal the
+        where values, ordered by (created_at, id) and starting after the
+        (created_at, id) pair after; as an iterator if stream is set"""
+        name = cls if type(cls) is str else cls.__name__
+        self.__build(name)
+        if where:
+            objs = self.__slice(self.__where(name, where), limit, after)
+            return iter(objs) if stream else objs
+        bucket = self.__classes.get(name, {})
+        if name not in self.__sorted:
+            self.__sorted[name] = sorted((obj.created_at, obj.id)
+                                         for obj in bucket.values())
+            for key, obj in bucket.items():
+                self.__sorted_as[key] = (obj.created_at, obj.id)
+        order = self.__sorted[name]
+        start = bisect_right(order, after) if after else 0
+        stop = start + limit if limit else None
+        objs = (bucket.get(name + "." + id)
+                for _, id in itertools.islice(order, start, stop))
+        objs = (obj for obj in objs if obj is not None)
+        return objs if stream else list(objs)
+
+    def __where(self, name, where):
+        """returns the objects of class name whose attributes equal the
+        where values, found through the index of the first one"""
+        attr, value = next(iter(where.items()))
+        return [obj for obj in self.related(name, attr, value)
+                if all(getattr(obj, field, None) == wanted
+                       for field, wanted in where.items())]
+
+    def search(self, cls, q, limit=None, stream=False, **where):
+        """returns up to limit objects of cls whose attributes equal the
+        where values and whose text holds a word of q, best match first;
+        as an iterator if stream is set"""
+        name = cls if type(cls) is str else cls.__name__
+        self.__build(name)
+        keys = None
+        if where:
+            keys = {name + "." + obj.id: None
+                    for obj in self.__where(name, where)}
+        objs = [self.__objects[key]
+                for _, key in self.__texts[name].search(q, keys)
+                if key in self.__objects][:limit]
+        return iter(objs) if stream else objs
+
+    def freshness(self, cls, **where):
+        """returns the latest updated_at and the number of the objects of
+        cls whose attributes equal the where values"""
+        name = cls if type(cls) is str else cls.__name__
+        if where:
+            objs = self.__where(name, where)
+        else:
+            objs = self.all(name).values()
+        return max((obj.updated_at for obj in objs), default=None), len(objs)
+
+    def __slice(self, objs, limit=None, after=None):
+        """orders objs by (created_at, id) and keeps up to limit of them
+        after the (created_at, id) pair after"""
+        objs = sorted(objs, key=lambda obj: (obj.created_at, obj.id))
+        start = 0
+        if after:
+            start = bisect_right([(obj.created_at, obj.id) for obj in objs],
+                                 after)
+        return objs[start:start + limit if limit else None]
+
+    def search_places(self, states=None, cities=None, amenities=None,
+                      limit=None, after=None, stream=False, price_min=None,
+                      price_max=None, min_guests=None, min_rooms=None,
+                      near=None, bbox=None, q=None):
+        """returns the places located in the given states or cities (all
+        places if neither is given) that have every given amenity, pass
+        the price_min, price_max, min_guests and min_rooms bounds and lie
+        inside the (west, south, east, north) bbox, paged like page()
+        when limit or after is given
+
+        With near, a (lat, lng, radius_km) circle, only the places inside
+        it are returned, nearest first, and limit keeps the nearest. With
+        q, only the places whose name or description holds one of its
+        words are returned, best match first unless near is given, and
+        limit keeps the best."""
+        criteria = {"price_min": price_min, "price_max": price_max,
+                    "min_guests": min_guests, "min_rooms": min_rooms}
+        criteria = {name: bound for name, bound in criteria.items()
+                    if bound is not None}
+        places = self.__search_places(states, cities, amenities, criteria,
+                                      near, bbox, q, limit, after)
+        return iter(places) if stream else places
+
+    def __search_places(self, states, cities, amenities, criteria, near,
+                        bbox, q, limit, after):
+        """returns the list of places search_places() asked for"""
+        self.__build("City")
+        self.__build("Place")
+        by_state = self.__refs.get(("City", "state_id"), {})
+        by_city = self.__refs.get(("Place", "city_id"), {})
+        keys = None
+        if states or cities:
+            city_ids = [key.split(".", 1)[1] for state_id in states or []
+                        for key in by_state.get(state_id, {})]
+            keys = {}
+            for city_id in city_ids + list(cities or []):
+                keys.update(by_city.get(city_id, {}))
+        amenities = set(amenities or [])
+        if any(self.get(Amenity, amenity_id) is None
+               for amenity_id in amenities):
+            return []
+        if len(amenities) == 1 and keys is None:
+            # a copy of the reverse index beats decoding one bitset
+            by_amenity = self.__refs.get(("Place", "amenity_ids"), {})
+            keys = dict(by_amenity.get(next(iter(amenities)), {}))
+        elif amenities:
+            # the AND of the bitsets of the amenities and of the places
+            # the states and cities left
+            keys = dict.fromkeys(self.__amenities.select(amenities, keys))
+        if criteria:
+            # evaluated over the columns of the places found so far, or
+            # of every place
+            keys = dict.fromkeys(self.__columns.select(keys, **criteria))
+        if bbox:
+            inside = self.__geo.within(*bbox)
+            keys = dict.fromkeys(key for key in inside
+                                 if keys is None or key in keys)
+        if q is not None:
+            found = [key for _, key in self.__texts["Place"].search(q, keys)]
+            if not near:
+                places = [self.__objects[key] for key in found
+                          if key in self.__objects]
+                return places[:limit] if limit else places
+            keys = dict.fromkeys(found)
+        if near:
+            places = [self.__objects[key] for _, key in self.__geo.near(*near)
+                      if (keys is None or key in keys) and
+                      key in self.__objects]
+            return places[:limit] if limit else places
+        if keys is None:
+            if limit or after:
+                return self.page(Place, limit, after)
+            return list(self.all(Place).values())
+        places = [self.__objects[key] for key in keys
+                  if key in self.__objects]
+        if limit or after:
+            return self.__slice(places, limit, after)
+        return places
+
+    def __put(self, key, obj):
+        """stores obj under key in __objects and its class bucket
+
+        The indexes are updated first, so an object one of them refuses
+        is not left in __objects without them."""
+        name = obj.__class__.__name__
+        if name in self.__sorted:
+            entry = (obj.created_at, obj.id)
+            if self.__sorted_as.get(key) != entry:
+                self.__unsort(key)
+                insort(self.__sorted[name], entry)
+                self.__sorted_as[key] = entry
+        if name in references:
+            self.__index(key, obj)
+        if name == "Place":
+            self.__columns.set(key, obj)
+            self.__geo.set(key, obj)
+            amenity_ids = getattr(obj, "amenity_ids", None)
+            self.__amenities.set(key, amenity_ids
+                                 if type(amenity_ids) is list else ())
+        if name in self.__texts:
+            self.__texts[name].set(key, obj)
+        self.__objects[key] = obj
+        self.__classes.setdefault(name, {})[key] = obj
+        if self.__raw.get(name):
+            self.__raw[name].pop(key, None)
+
+    def __load(self, key, obj):
+        """stores obj, read from the files, under key like __put(); if an
+        index refuses it, it is still stored without that index rather
+        than stopping the load or being left out of the next write"""
+        try:
+            self.__put(key, obj)
+        except (TypeError, ValueError):
+            self.__objects[key] = obj
+            self.__classes.setdefault(obj.__class__.__name__, {})[key] = obj
+            if self.__raw.get(obj.__class__.__name__):
+                self.__raw[obj.__class__.__name__].pop(key, None)
+
+    def __pop(self, key):
+        """removes key from __objects and its class bucket"""
+        name = key.split(".", 1)[0]
+        self.__objects.pop(key, None)
+        self.__classes.get(name, {}).pop(key, None)
+        self.__raw.get(name, {}).pop(key, None)
+        self.__unindex(key)
+        self.__unsort(key)
+        if name == "Place":
+            self.__columns.remove(key)
+            self.__geo.remove(key)
+            self.__amenities.remove(key)
+        if name in self.__texts:
+            self.__texts[name].remove(key)
+
+    def __unsort(self, key):
+        """removes key from the sorted (created_at, id) pairs of its class"""
+        entry = self.__sorted_as.pop(key, None)
+        if entry is not None:
+            order = self.__sorted[key.split(".", 1)[0]]
+            del order[bisect_left(order, entry)]
+
+    def __index(self, key, obj):
+        """files key under the current values of the references of obj,
+        moving it if they changed since it was last indexed
+
+        The ids obj refers to are interned and put back on it, so the
+        children of one object share a single copy of its id. Only ids
+        are indexed: a value that is not a string, which the API lets
+        through in amenity_ids, is left out."""
+        name = obj.__class__.__name__
+        values = []
+        for attr in references[name]:
+            value = getattr(obj, attr, None)
+            if type(value) is str and \
+                    value is not getattr(type(obj), attr, None):
+                value = sys.intern(value)
+                setattr(obj, attr, value)
+            elif type(value) is list:
+                value[:] = [sys.intern(item) if type(item) is str else item
+                            for item in value]
+            if type(value) is list:
+                value = tuple(item for item in value if type(item) is str)
+            elif type(value) is not str:
+                value = None
+            values.append(value)
+        values = tuple(values)
+        if self.__ref_of.get(key) == values:
+            return
+        self.__unindex(key)
+        for attr, value in zip(references[name], values):
+            index = self.__refs.setdefault((name, attr), {})
+            for item in value if type(value) is tuple else (value,):
+                index.setdefault(item, {})[key] = None
+        self.__ref_of[key] = values
+
+    def __unindex(self, key):
+        """removes key from the reverse indexes it is filed in"""
+        values = self.__ref_of.pop(key, None)
+        if values is None:
+            return
+        name = key.split(".", 1)[0]
+        for attr, value in zip(references[name], values):
+            index = self.__refs[(name, attr)]
+            for item in value if type(value) is tuple else (value,):
+                keys = index.get(item, {})
+                keys.pop(key, None)
+                if not keys:
+                    index.pop(item, None)
+
+    def __build(self, name, key=None):
+        """builds the model objects of the raw records of class name, or
+        only the one stored under key"""
+        bucket = self.__raw.get(name)
+        if not bucket:
+            return
+        for key in list(bucket) if key is None else [key]:
+            if key in bucket:
+                record = serializer.loads(bucket[key])
+                self.__load(key, classes[record["__class__"]](**record))
+
+    def __signature(self):
+        """returns the os.stat() signature of the JSON file and journal"""
+        signature = []
+        for path in (self.__file_path, self.__journal_path):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def __write_snapshot(self, records):
+        """atomically replaces the JSON file with the (key, JSON text)
+        records, one per line behind a checksum header, keeping the file
+        it replaces as __backup_path; if writing fails, the temporary
+        file is removed and the JSON file is left as it was"""
+        tmp_path = self.__file_path + ".tmp"
+        digest = sha256()
+        try:
+            with open(tmp_path, 'wb') as f:
+                # placeholder, rewritten once the whole body is hashed
+                f.write(b"#sha256 " + b"0" * 64 + b"\n")
+                sep = b"{\n"
+                for key, record in records:
+                    chunk = sep + (json.dumps(key) + ": " +
+                                   record).encode("utf-8")
+                    digest.update(chunk)
+                    f.write(chunk)
+                    sep = b",\n"
+                chunk = b"{\n}\n" if sep == b"{\n" else b"\n}\n"
+                digest.update(chunk)
+                f.write(chunk)
+                f.seek(0)
+                f.write(b"#sha256 " + digest.hexdigest().encode())
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.__file_path) and not self.__damaged:
+                if os.path.exists(self.__backup_path):
+                    os.remove(self.__backup_path)
+                try:
+                    os.link(self.__file_path, self.__backup_path)
+                except OSError:
+                    # no hard links on this file system
+                    shutil.copy2(self.__file_path, self.__backup_path)
+            os.replace(tmp_path, self.__file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        FileStorage.__damaged = False
+        fd = os.open(os.path.dirname(os.path.abspath(self.__file_path)),
+                     os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __read_snapshot(self, path):
+        """returns the objects stored at path, None if there is no such
+        file, and raises ValueError if it is damaged
+
+        Snapshots written one record per line are parsed line by line, so
+        only one raw dictionary is alive at a time; older single-line
+        files are still read whole. In lazy mode the records of a
+        per-line snapshot are returned as their raw JSON text."""
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        objects = {}
+        with f:
+            line = f.readline()
+            checksum = None
+            if line.startswith(b"#sha256 "):
+                checksum = line[8:].strip().decode()
+                line = f.readline()
+            digest = sha256(line)
+            try:
+                if line.strip() != b"{":
+                    line += f.read()
+                    digest = sha256(line)
+                    jo = serializer.loads(line) if line.strip() else {}
+                    for key, record in jo.items():
+                        objects[key] = classes[record["__class__"]](**record)
+                else:
+                    for line in f:
+                        digest.update(line)
+                        text = line.decode("utf-8").rstrip().rstrip(",")
+                        if text in ("", "}"):
+                            continue
+                        key, end = _decoder.raw_decode(text)
+                        text = text[text.index(":", end) + 1:].lstrip()
+                        if self.__lazy:
+                            objects[key] = text
+                            continue
+                        record = serializer.loads(text)
+                        objects[key] = classes[record["__class__"]](**record)
+            except (KeyError, TypeError) as err:
+                raise ValueError("{} holds a bad record".format(path)) from err
+        if checksum is not None and checksum != digest.hexdigest():
+            raise ValueError("{} failed its checksum".format(path))
+        return objects
+
+    def __append_journal(self):
+        """appends one JSON line per object changed since the last save"""
+        lines = []
+        for key, obj in self.__dirty.items():
+            entry = {"key": key, "obj": obj.to_dict() if obj else None}
+            lines.append(serializer.dumps(entry) + "\n")
+        with open(self.__journal_path, 'a', encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        FileStorage.__journaled += len(lines)
+        FileStorage.__seen = self.__signature()
+        self.__dirty.clear()
+
+    def __replay_journal(self):
+        """re-applies the journal on top of the objects loaded from the
+        JSON file, cutting off a torn last line left by a crash"""
+        FileStorage.__journaled = 0
+        if not os.path.exists(self.__journal_path):
+            return
+        good = 0
+        with open(self.__journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = serializer.loads(line)
+                    key, obj = entry["key"], entry["obj"]
+                    if obj is None:
+                        self.__pop(key)
+                    else:
+                        self.__load(key, classes[obj["__class__"]](**obj))
+                except (ValueError, KeyError, TypeError):
+                    break
+                good += len(line)
+                FileStorage.__journaled += 1
+        if good < os.path.getsize(self.__journal_path):
+            os.truncate(self.__journal_path, good)
 
     def close(self):
-        """call reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """call reload() method for deserializing the JSON file to objects,
+        unless the files have not changed since they were last read or
+        written by this process"""
+        if self.__signature() != self.__seen:
+            self.reload()
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=None):
         """this method retrieves the object based on the class name and
-        the id"""
+        the id; load is only used by DBStorage"""
         if cls not in classes.values():
             return None
 
-        all_cls = models.storage.all(cls)
-        for val in all_cls.values():
-            if val.id == id:
-                return val
-        return None
+        key = cls.__name__ + "." + str(id)
+        if key not in self.__objects:
+            self.__build(cls.__name__, key)
+        return self.__objects.get(key)
 
     def count(self, cls=None):
         """this method returns the number of objects present in storage"""
-        all_cls = classes.values()
-
         if not cls:
-            count = 0
-            for clss in all_cls:
-                count += len(models.storage.all(clss).values())
-        else:
-            count = len(models.storage.all(cls).values())
+            return len(self.__objects) + sum(len(bucket) for bucket
+                                             in self.__raw.values())
 
-        return count
+        name = cls if type(cls) is str else cls.__name__
+        return len(self.__classes.get(name, {})) + \
+            len(self.__raw.get(name, {}))
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+"""
+Contains GridIndex, the spatial index FileStorage keeps over the latitude
+and longitude of its places, and the distance helpers both storage
+engines share
+
+The index files every place in the cell of a fixed grid (0.1 degree by
+default, about 11 km) its coordinates fall in, so a bounding box or a
+radius only looks at the places of the cells it overlaps. Boxes are
+given as (west, south, east, north) in degrees, GeoJSON's bbox order; a
+box whose west is greater than its east crosses the 180th meridian.
+"""
+
+import math
+from models.engine.columns import number
+
+# mean radius of the Earth, in kilometres
+earth_radius_km = 6371.0088
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """returns the great-circle distance between two points, in km"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * \
+        math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * earth_radius_km * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """returns the smallest (west, south, east, north) box holding every
+    point within radius_km of (lat, lng)"""
+    angle = radius_km / earth_radius_km
+    south = lat - math.degrees(angle)
+    north = lat + math.degrees(angle)
+    if south <= -90 or north >= 90 or angle >= math.pi / 2:
+        # the circle holds a pole: every longitude is in it
+        return -180.0, max(south, -90.0), 180.0, min(north, 90.0)
+    spread = math.sin(angle) / math.cos(math.radians(lat))
+    if spread >= 1:
+        return -180.0, south, 180.0, north
+    spread = math.degrees(math.asin(spread))
+    west = lng - spread
+    east = lng + spread
+    if west < -180:
+        west += 360
+    if east > 180:
+        east -= 360
+    return west, south, east, north
+
+
+def lng_spans(west, east):
+    """returns the (west, east) spans of longitudes a box covers, two of
+    them when it crosses the 180th meridian"""
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+class GridIndex:
+    """the places filed by the cell of a grid their coordinates fall in"""
+
+    def __init__(self, size=0.1):
+        """this method creates an empty index of size degree cells"""
+        self.size = size
+        # dictionary - (row, column) of each cell mapped to the keys of
+        # the places in it
+        self.cells = {}
+        # dictionary - key of each place mapped to its (lat, lng)
+        self.points = {}
+
+    def __len__(self):
+        """this method returns the number of places indexed"""
+        return len(self.points)
+
+    def cell(self, lat, lng):
+        """this method returns the cell (lat, lng) falls in"""
+        return math.floor(lat / self.size), math.floor(lng / self.size)
+
+    def set(self, key, obj):
+        """this method files the place obj stored under key at its
+        coordinates, leaving it out if it has no valid ones of its own"""
+        lat, lng = (getattr(obj, attr, None)
+                    for attr in ("latitude", "longitude"))
+        if lat is getattr(type(obj), "latitude", None) or \
+                lng is getattr(type(obj), "longitude", None):
+            # the class defaults: the place was never located
+            lat = lng = None
+        lat, lng = number(lat), number(lng)
+        if self.points.get(key) == (lat, lng):
+            return
+        self.remove(key)
+        if -90 <= lat <= 90 and -180 <= lng <= 180:
+            self.points[key] = (lat, lng)
+            self.cells.setdefault(self.cell(lat, lng), {})[key] = None
+
+    def remove(self, key):
+        """this method drops the place stored under key"""
+        point = self.points.pop(key, None)
+        if point is not None:
+            cell = self.cell(*point)
+            keys = self.cells[cell]
+            del keys[key]
+            if not keys:
+                del self.cells[cell]
+
+    def within(self, west, south, east, north):
+        """this method returns the keys of the places inside the box"""
+        found = []
+        for low, high in lng_spans(west, east):
+            for key in self.__candidates(south, low, north, high):
+                lat, lng = self.points[key]
+                if south <= lat <= north and low <= lng <= high:
+                    found.append(key)
+        return found
+
+    def near(self, lat, lng, radius_km):
+        """this method returns the (distance in km, key) pairs of the
+        places within radius_km of (lat, lng), nearest first"""
+        found = []
+        for key in self.within(*bounding_box(lat, lng, radius_km)):
+            distance = distance_km(lat, lng, *self.points[key])
+            if distance <= radius_km:
+                found.append((distance, key))
+        found.sort()
+        return found
+
+    def __candidates(self, south, west, north, east):
+        """this method returns the keys of the places in the cells
+        overlapping a box that does not cross the 180th meridian"""
+        first_row, first_col = self.cell(south, west)
+        last_row, last_col = self.cell(north, east)
+        rows = range(first_row, last_row + 1)
+        cols = range(first_col, last_col + 1)
+        if len(rows) * len(cols) > len(self.cells):
+            # a box larger than the occupied cells: walk those instead
+            return [key for (row, col), keys in self.cells.items()
+                    if row in rows and col in cols for key in keys]
+        return [key for row in rows for col in cols
+                for key in self.cells.get((row, col), ())]
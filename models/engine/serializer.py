@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""
+Contains the JSON serializer shared by FileStorage and the API
+
+HBNB_JSON picks the library: "orjson", "ujson" or "json" (the standard
+library). It defaults to "auto", which takes the fastest one installed.
+Every backend writes compact JSON as str and reads str or bytes. What
+orjson and ujson cannot write, such as integers wider than 64 bits, is
+written by the standard library instead, and text that may hold such an
+integer is read by it, as orjson would read it as a float.
+"""
+
+import json
+from os import getenv
+import re
+
+# 19 digits in a row: maybe an integer past 64 bits
+_long_number = re.compile(r"[0-9]{19}")
+_long_number_bytes = re.compile(rb"[0-9]{19}")
+
+
+def _guarded(loads):
+    """returns loads, handing the text that may hold an integer past 64
+    bits to the standard library"""
+    def guarded(text):
+        """parses a JSON str or bytes"""
+        if type(text) is str:
+            found = _long_number.search(text)
+        else:
+            found = _long_number_bytes.search(text)
+        return json.loads(text) if found else loads(text)
+
+    return guarded
+
+
+def _orjson():
+    """returns the dumps and loads functions backed by orjson"""
+    import orjson
+
+    def dumps(obj, default=None, sort_keys=False):
+        """serializes obj to a JSON str"""
+        option = orjson.OPT_NON_STR_KEYS
+        if default is not None:
+            # let the caller decide how dates look, as the others do
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode()
+        except TypeError:
+            # orjson.JSONEncodeError, raised for integers past 64 bits too
+            return _stdlib_dumps(obj, default, sort_keys)
+
+    return dumps, _guarded(orjson.loads)
+
+
+def _ujson():
+    """returns the dumps and loads functions backed by ujson"""
+    import ujson
+
+    def dumps(obj, default=None, sort_keys=False):
+        """serializes obj to a JSON str"""
+        try:
+            return ujson.dumps(obj, ensure_ascii=False, sort_keys=sort_keys,
+                               escape_forward_slashes=False, default=default)
+        except (OverflowError, TypeError):
+            return _stdlib_dumps(obj, default, sort_keys)
+
+    return dumps, _guarded(ujson.loads)
+
+
+def _stdlib_dumps(obj, default=None, sort_keys=False):
+    """serializes obj to a JSON str with the standard library"""
+    return json.dumps(obj, ensure_ascii=False, sort_keys=sort_keys,
+                      separators=(",", ":"), default=default)
+
+
+def _json():
+    """returns the dumps and loads functions of the standard library"""
+    return _stdlib_dumps, json.loads
+
+
+backends = {"orjson": _orjson, "ujson": _ujson, "json": _json}
+
+
+def backend(name):
+    """returns the (dumps, loads) pair of the backend called name, raising
+    ImportError if its library is not installed"""
+    if name not in backends:
+        raise ValueError("unknown JSON backend: {}".format(name))
+    return backends[name]()
+
+
+def available():
+    """returns the names of the backends that can be used here"""
+    names = []
+    for name in backends:
+        try:
+            backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+name = getenv("HBNB_JSON", "auto")
+if name == "auto":
+    name = available()[0]
+dumps, loads = backend(name)
@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+"""
+Contains TextIndex, the inverted index FileStorage keeps over the text of
+its places and reviews, and the tokenizer it uses
+
+Text is cut into lowercase words, and every word gets a posting list: the
+keys of the objects holding it mapped to how many times they do. A query
+only reads the posting lists of its own words and ranks the objects
+holding any of them with BM25, which favours the words few objects hold
+and discounts long texts. An object is re-indexed when new() stores it
+with a text that changed, and dropped when it is deleted.
+"""
+
+from collections import Counter
+import math
+import re
+import sys
+
+# class name -> attributes searched by the q criteria; DBStorage declares
+# its MySQL FULLTEXT indexes over the same columns
+searchable = {"Place": ("name", "description"), "Review": ("text",)}
+_word = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """returns the lowercase words of text, none if it is not a string"""
+    if type(text) is not str:
+        return []
+    return _word.findall(text.casefold())
+
+
+class TextIndex:
+    """the posting lists of the words of some attributes of a set of
+    objects, ranked with BM25"""
+
+    # BM25 term frequency saturation and length normalization
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, fields):
+        """this method creates an empty index of the fields attributes"""
+        self.fields = fields
+        # dictionary - word mapped to the keys of the objects holding it
+        # and the number of times they do
+        self.postings = {}
+        # dictionary - key of each object mapped to the values of fields
+        # it was indexed with
+        self.texts = {}
+        # dictionary - key of each object mapped to its distinct words
+        self.words = {}
+        # dictionary - key of each object mapped to its number of words
+        self.lengths = {}
+        # integer - the number of words of all the objects
+        self.total = 0
+
+    def __len__(self):
+        """this method returns the number of objects indexed"""
+        return len(self.lengths)
+
+    def set(self, key, obj):
+        """this method indexes the text of obj stored under key"""
+        text = tuple(getattr(obj, field, None) for field in self.fields)
+        if self.texts.get(key) == text:
+            return
+        self.remove(key)
+        # interned, so the words of every object share the posting keys
+        counts = Counter(sys.intern(word) for value in text
+                         for word in tokenize(value))
+        for word, count in counts.items():
+            self.postings.setdefault(word, {})[key] = count
+        self.texts[key] = text
+        self.words[key] = tuple(counts)
+        self.lengths[key] = length = sum(counts.values())
+        self.total += length
+
+    def remove(self, key):
+        """this method drops the object stored under key"""
+        if key not in self.lengths:
+            return
+        for word in self.words.pop(key):
+            keys = self.postings[word]
+            del keys[key]
+            if not keys:
+                del self.postings[word]
+        del self.texts[key]
+        self.total -= self.lengths.pop(key)
+
+    def search(self, query, keys=None):
+        """this method returns the (score, key) pairs of the objects
+        holding a word of query, best first; only the objects stored
+        under keys are looked at when it is given"""
+        count = len(self.lengths)
+        if not count:
+            return []
+        average = self.total / count or 1
+        scores = {}
+        for word in set(tokenize(query)):
+            postings = self.postings.get(word)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) /
+                           (len(postings) + 0.5))
+            if keys is None:
+                found = postings.items()
+            elif len(keys) < len(postings):
+                found = [(key, postings[key]) for key in keys
+                         if key in postings]
+            else:
+                found = [(key, frequency)
+                         for key, frequency in postings.items()
+                         if key in keys]
+            for key, frequency in found:
+                scale = self.k1 * (1 - self.b + self.b *
+                                   self.lengths[key] / average)
+                scores[key] = scores.get(key, 0.0) + idf * frequency * \
+                    (self.k1 + 1) / (frequency + scale)
+        return sorted(((score, key) for key, score in scores.items()),
+                      key=lambda pair: (-pair[0], pair[1]))
@@ -4,15 +4,22 @@ import models
 from models.base_model import BaseModel, Base
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 
 
 class Review(BaseModel, Base):
     """Representation of Review """
     if models.storage_t == 'db':
         __tablename__ = 'reviews'
+        # the reviews of a place, in the (created_at, id) page order, and
+        # the words of their text (GET /places/<place_id>/reviews?q=)
+        __table_args__ = (Index('ix_reviews_place_id_created_at',
+                                'place_id', 'created_at'),
+                          Index('ix_reviews_fulltext', 'text',
+                                mysql_prefix='FULLTEXT'))
         place_id = Column(String(60), ForeignKey('places.id'), nullable=False)
-        user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+        user_id = Column(String(60), ForeignKey('users.id'), nullable=False,
+                         index=True)
         text = Column(String(1024), nullable=False)
     else:
         place_id = ""
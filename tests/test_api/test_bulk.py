@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+"""
+Contains the TestBulk classes
+"""
+
+from api.v1 import bulk
+from api.v1.app import app
+import models
+from models import storage
+from models.place import Place
+from models.review import Review
+from models.user import User
+import pep8
+import unittest
+
+
+class TestBulkDocs(unittest.TestCase):
+    """Tests to check the documentation and style of bulk.py"""
+
+    def test_pep8_conformance_bulk(self):
+        """Test that api/v1/bulk.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/bulk.py',
+                                    'tests/test_api/test_bulk.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_bulk_module_docstring(self):
+        """Test for the bulk.py module docstring"""
+        self.assertIsNot(bulk.__doc__, None, "bulk.py needs a docstring")
+
+
+class TestBulk(unittest.TestCase):
+    """Test the bulk creation endpoints"""
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bulk_reviews_references(self):
+        """Test that a bulk POST answers a reference id that is not a
+        string like the single-object POST, and stores nothing"""
+        user = User(email="bulk@hbnb.io", password="pwd")
+        place = Place(name="Bulk", user_id=user.id)
+        for obj in (user, place):
+            storage.new(obj)
+        storage.save()
+        client = app.test_client()
+        url = '/api/v1/places/{}/reviews'.format(place.id)
+        for user_id in (["x"], {"id": user.id}, 7, None, "missing"):
+            with self.subTest(user_id=user_id):
+                review = {"text": "Good", "user_id": user_id}
+                self.assertEqual(client.post(url, json=review).status_code,
+                                 404)
+                self.assertEqual(client.post(url + '/bulk', json=[
+                    {"text": "Fine", "user_id": user.id}, review])
+                    .status_code, 404)
+        self.assertEqual(storage.related(Review, "place_id", place.id), [])
+        response = client.post(url + '/bulk', json=[
+            {"text": "Fine", "user_id": user.id},
+            {"text": "Great", "user_id": user.id}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(storage.related(Review, "place_id", place.id)),
+                         2)
+        for obj in storage.related(Review, "place_id", place.id) + \
+                [place, user]:
+            storage.delete(obj)
+        storage.save()
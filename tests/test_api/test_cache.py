@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+"""
+Contains the TestLocalCache and TestSharedCache classes
+"""
+
+from api.v1 import cache
+from api.v1.cache import LocalCache, MemoryStore, SharedCache, tags_of
+from models.city import City
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestCacheDocs(unittest.TestCase):
+    """Tests to check the documentation and style of cache.py"""
+
+    def test_pep8_conformance_cache(self):
+        """Test that api/v1/cache.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/cache.py',
+                                    'tests/test_api/test_cache.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_cache_module_docstring(self):
+        """Test for the cache.py module docstring"""
+        self.assertIsNot(cache.__doc__, None, "cache.py needs a docstring")
+
+
+class TestLocalCache(unittest.TestCase):
+    """Test the LocalCache class"""
+
+    def test_tags_of(self):
+        """Test that a change invalidates the class, key and references"""
+        city = City(name="Kano", state_id="s1")
+        self.assertEqual(tags_of(city), {"City", "City." + city.id,
+                                         "City:state_id=s1"})
+        self.assertEqual(tags_of(None), {"*"})
+
+    def test_invalidate(self):
+        """Test that invalidating a tag drops the entries built with it"""
+        local = LocalCache()
+        local.set("states", "a", ["State"], local.token(["State"]))
+        local.set("cities", "b", ["City"], local.token(["City"]))
+        local.invalidate(["State"])
+        self.assertIsNone(local.get("states"))
+        self.assertEqual(local.get("cities"), "b")
+        local.invalidate(["*"])
+        self.assertIsNone(local.get("cities"))
+
+    def test_invalidated_while_building(self):
+        """Test that a response built across an invalidation of one of
+        its tags is not stored, and one of other tags is"""
+        local = LocalCache()
+        token = local.token(["State"])
+        local.invalidate(["State"])
+        local.set("states", "stale", ["State"], token)
+        self.assertIsNone(local.get("states"))
+        self.assertEqual(local.counters["skipped"], 1)
+        token = local.token(["City"])
+        local.invalidate(["State"])
+        local.set("cities", "fresh", ["City"], token)
+        self.assertEqual(local.get("cities"), "fresh")
+
+    def test_invalidated_while_building_forgotten(self):
+        """Test that a build older than the invalidations still remembered
+        is not stored, whatever its tags"""
+        local = LocalCache(size=2)
+        token = local.token(["State"])
+        for tag in ("City", "Place", "Review"):
+            local.invalidate([tag])
+        local.set("states", "stale", ["State"], token)
+        self.assertIsNone(local.get("states"))
+        self.assertEqual(local.counters["skipped"], 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry goes past size"""
+        local = LocalCache(size=2)
+        for key in ("a", "b"):
+            local.set(key, key, ["State"], local.token(["State"]))
+        self.assertEqual(local.get("a"), "a")
+        local.set("c", "c", ["State"], local.token(["State"]))
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.get("a"), "a")
+        self.assertEqual(local.get("c"), "c")
+        self.assertEqual(local.counters["evictions"], 1)
+        self.assertEqual(local.stats()["entries"], 2)
+
+    def test_ttl_expiry(self):
+        """Test that an entry is not served past its time to live"""
+        with mock.patch("api.v1.cache.time") as clock:
+            clock.monotonic.return_value = 100.0
+            local = LocalCache(ttl=60)
+            local.set("states", "a", ["State"], local.token(["State"]))
+            clock.monotonic.return_value = 159.0
+            self.assertEqual(local.get("states"), "a")
+            clock.monotonic.return_value = 161.0
+            self.assertIsNone(local.get("states"))
+        self.assertEqual(local.stats()["entries"], 0)
+
+
+class TestSharedCache(unittest.TestCase):
+    """Test the SharedCache and MemoryStore classes"""
+
+    def test_invalidated_by_other_worker(self):
+        """Test that a tag version bumped through a second cache over the
+        same store stops the first one serving its entries"""
+        store = MemoryStore()
+        first, second = SharedCache(store), SharedCache(store)
+        first.set("states", "a", ["State"], first.token(["State"]))
+        first.set("cities", "b", ["City"], first.token(["City"]))
+        self.assertEqual(second.get("states"), "a")
+        second.invalidate(["State"])
+        self.assertIsNone(first.get("states"))
+        self.assertEqual(first.get("cities"), "b")
+
+    def test_invalidated_while_building(self):
+        """Test that a response built while another worker invalidated
+        one of its tags is not stored"""
+        store = MemoryStore()
+        first, second = SharedCache(store), SharedCache(store)
+        token = first.token(["State"])
+        second.invalidate(["State"])
+        first.set("states", "stale", ["State"], token)
+        self.assertIsNone(first.get("states"))
+        self.assertEqual(first.counters["skipped"], 1)
+
+    def test_store_expiry_and_size(self):
+        """Test that the store drops values past their ttl or its size"""
+        with mock.patch("api.v1.cache.time") as clock:
+            clock.monotonic.return_value = 100.0
+            store = MemoryStore(size=2)
+            store.set("a", 1, ttl=10)
+            store.set("b", 2)
+            clock.monotonic.return_value = 111.0
+            self.assertIsNone(store.get("a"))
+            store.set("c", 3)
+            store.set("d", 4)
+            self.assertIsNone(store.get("b"))
+            self.assertEqual(store.get("d"), 4)
@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+"""
+Contains the TestConditional classes
+"""
+
+from api.v1 import conditional
+from api.v1.app import app
+import models
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.user import User
+import pep8
+import unittest
+
+
+class TestConditionalDocs(unittest.TestCase):
+    """Tests to check the documentation and style of conditional.py"""
+
+    def test_pep8_conformance_conditional(self):
+        """Test that api/v1/conditional.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/conditional.py',
+                                    'tests/test_api/test_conditional.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_conditional_module_docstring(self):
+        """Test for the conditional.py module docstring"""
+        self.assertIsNot(conditional.__doc__, None,
+                         "conditional.py needs a docstring")
+
+
+class TestConditional(unittest.TestCase):
+    """Test the ETag and 304 answers of the read endpoints"""
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_place_etag_follows_amenities(self):
+        """Test that linking an amenity to a place changes its ETag, so
+        If-None-Match no longer gets a 304"""
+        user = User(email="etag@hbnb.io", password="pwd")
+        city = City(name="Jos")
+        place = Place(name="Etag", city_id=city.id, user_id=user.id)
+        amenity = Amenity(name="Wifi")
+        for obj in (user, city, place, amenity):
+            storage.new(obj)
+        storage.save()
+        client = app.test_client()
+        url = '/api/v1/places/' + place.id
+        link = url + '/amenities/' + amenity.id
+        first = client.get(url)
+        etag = first.headers['ETag'].strip('"')
+        self.assertEqual(client.get(url, headers={
+            'If-None-Match': first.headers['ETag']}).status_code, 304)
+        self.assertEqual(client.post(link).status_code, 201)
+        second = client.get(url, headers={
+            'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.get_json()['amenity_ids'], [amenity.id])
+        self.assertNotEqual(second.headers['ETag'].strip('"'), etag)
+        self.assertEqual(client.delete(link).status_code, 200)
+        third = client.get(url, headers={
+            'If-None-Match': second.headers['ETag']})
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.get_json()['amenity_ids'], [])
+        for obj in (user, city, place, amenity):
+            storage.delete(obj)
+        storage.save()
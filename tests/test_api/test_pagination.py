@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+Contains the TestPagination classes
+"""
+
+from api.v1.app import app
+from base64 import urlsafe_b64encode
+import models
+import pep8
+import unittest
+
+
+class TestPaginationDocs(unittest.TestCase):
+    """Tests to check the style of pagination.py"""
+
+    def test_pep8_conformance_pagination(self):
+        """Test that api/v1/pagination.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/pagination.py',
+                                    'tests/test_api/test_pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+class TestPagination(unittest.TestCase):
+    """Test the limit and cursor query arguments"""
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bad_page_args(self):
+        """Test that limits and cursors the storage cannot use get a 400"""
+        client = app.test_client()
+        self.assertEqual(client.get('/api/v1/states?limit=2').status_code,
+                         200)
+        for limit in ('0', '-1', 'x', '²', '٢'):
+            with self.subTest(limit=limit):
+                self.assertEqual(client.get('/api/v1/states',
+                                            query_string={'limit': limit})
+                                 .status_code, 400)
+        for text in ('2020-01-01T00:00:00+00:00|x', '2020-01-01T00:00:00',
+                     'garbage', '\udcff'):
+            cursor = urlsafe_b64encode(
+                text.encode('utf-8', 'surrogateescape')).decode()
+            with self.subTest(cursor=text):
+                self.assertEqual(client.get('/api/v1/states',
+                                            query_string={'cursor': cursor})
+                                 .status_code, 400)
+        cursor = urlsafe_b64encode(b'2020-01-01T00:00:00.000000|x').decode()
+        self.assertEqual(client.get('/api/v1/states',
+                                    query_string={'cursor': cursor})
+                         .status_code, 200)
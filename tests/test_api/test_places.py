@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""
+Contains the TestPlacesSearch classes
+"""
+
+from api.v1.app import app
+import models
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8
+import unittest
+
+
+class TestPlacesDocs(unittest.TestCase):
+    """Tests to check the style of places.py"""
+
+    def test_pep8_conformance_places(self):
+        """Test that api/v1/views/places.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['api/v1/views/places.py',
+                                    'tests/test_api/test_places.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+
+class TestPlacesSearch(unittest.TestCase):
+    """Test the states, cities and amenities criteria of places_search"""
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_ids_not_strings(self):
+        """Test that a criterion that is not a list of ids gets a 400"""
+        user = User(email="search@hbnb.io", password="pwd")
+        state = State(name="Lagos")
+        city = City(name="Ikeja", state_id=state.id)
+        amenity = Amenity(name="Pool")
+        place = Place(name="Search", city_id=city.id, user_id=user.id,
+                      amenity_ids=[amenity.id])
+        for obj in (user, state, city, amenity, place):
+            storage.new(obj)
+        storage.save()
+        client = app.test_client()
+        url = '/api/v1/places_search'
+        for name in ('states', 'cities', 'amenities'):
+            for ids in ([[1]], [{"a": 1}], [None], [7], "x", {"a": 1}):
+                with self.subTest(name=name, ids=ids):
+                    self.assertEqual(client.post(url, json={name: ids})
+                                     .status_code, 400)
+        for search in ({"states": [state.id]}, {"cities": [city.id]},
+                       {"amenities": [amenity.id]}):
+            with self.subTest(search=search):
+                response = client.post(url, json=search)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([found['id'] for found in
+                                  response.get_json()], [place.id])
+        for obj in (place, amenity, city, state, user):
+            storage.delete(obj)
+        storage.save()
@@ -138,6 +138,21 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(new_d["created_at"], bm.created_at.strftime(t_format))
         self.assertEqual(new_d["updated_at"], bm.updated_at.strftime(t_format))
 
+    def test_kwargs_dates_with_offset(self):
+        """test that kwargs dates with a UTC offset become naive UTC and
+        that to_dict() writes them in the stored format"""
+        bm = BaseModel(created_at="2020-01-01T01:00:00+01:00",
+                       updated_at="2020-01-01T00:00:00Z")
+        self.assertIsNone(bm.created_at.tzinfo)
+        self.assertEqual(bm.created_at, datetime(2020, 1, 1))
+        self.assertEqual(bm.updated_at, datetime(2020, 1, 1))
+        self.assertEqual(bm.to_dict()["created_at"],
+                         "2020-01-01T00:00:00.000000")
+        old = BaseModel(created_at="2020-01-01T00:00:00+00:00.000000")
+        self.assertEqual(old.created_at, datetime(2020, 1, 1))
+        with self.assertRaises(ValueError):
+            BaseModel(created_at="2020-01-01")
+
     def test_str(self):
         """test that the str method has the correct output"""
         inst = BaseModel()
@@ -17,6 +17,7 @@ from models.user import User
 import json
 import os
 import pep8
+import sqlalchemy
 import unittest
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
@@ -109,3 +110,83 @@ class TestFileStorage(unittest.TestCase):
         storage.save()
         cnt = storage.count()
         self.assertEqual(len(storage.all()), cnt)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_count_cls(self):
+        """Test that count(cls) matches the rows of that class only"""
+        storage = models.storage
+        before = storage.count(State)
+        state = State(name="Ogun")
+        storage.new(state)
+        storage.save()
+        self.assertEqual(storage.count(State), before + 1)
+        self.assertEqual(storage.count("State"), before + 1)
+        self.assertEqual(storage.count(State), len(storage.all(State)))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_all_load(self):
+        """Test that load fetches the cities of every state in one query"""
+        storage = models.storage
+        for name in ("Oyo", "Osun"):
+            state = State(name=name)
+            storage.new(state)
+            storage.new(City(name="Capital", state_id=state.id))
+        storage.save()
+        storage.close()
+        with storage.statements() as sql:
+            states = storage.all(State, load=("cities",)).values()
+            cities = [city.to_dict() for state in states
+                      for city in state.cities]
+        self.assertEqual(len(sql), 2)
+        self.assertGreaterEqual(len(cities), 2)
+        self.assertNotIn("cities", list(states)[0].to_dict())
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_pool_stats(self):
+        """Test that pool_stats reports the pool and its checkout waits"""
+        models.storage.count(State)
+        stats = models.storage.pool_stats()
+        self.assertEqual(stats["class"], "TimedQueuePool")
+        self.assertEqual(stats["size"],
+                         int(os.getenv("HBNB_MYSQL_POOL_SIZE", 5)))
+        self.assertGreaterEqual(stats["waits"], 1)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_explain_uses_indexes(self):
+        """Test that MySQL can plan the common lookups with the indexes"""
+        queries = {
+            "ix_reviews_place_id_created_at":
+                "SELECT id FROM reviews WHERE place_id = 'x' "
+                "ORDER BY created_at, id",
+            "ix_places_city_id_price_by_night":
+                "SELECT id FROM places WHERE city_id = 'x' "
+                "AND price_by_night BETWEEN 10 AND 100",
+            "ix_cities_state_id": "SELECT id FROM cities WHERE state_id = 'x'",
+            "ix_users_email": "SELECT id FROM users WHERE email LIKE 'x%'",
+            "ix_place_amenity_amenity_id":
+                "SELECT place_id FROM place_amenity WHERE amenity_id = 'x'",
+            "ix_places_fulltext":
+                "SELECT id FROM places WHERE MATCH (name, description) "
+                "AGAINST ('pool' IN NATURAL LANGUAGE MODE)",
+            "ix_reviews_fulltext":
+                "SELECT id FROM reviews WHERE MATCH (text) "
+                "AGAINST ('quiet' IN NATURAL LANGUAGE MODE)",
+        }
+        engine = models.storage._DBStorage__engine
+        with engine.connect() as conn:
+            for index, query in queries.items():
+                plan = conn.execute(
+                    sqlalchemy.text("EXPLAIN " + query)).mappings().first()
+                self.assertIn(index, (plan["possible_keys"] or "").split(","),
+                              query)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_migration_covers_indexes(self):
+        """Test that migrate_mysql_indexes.sql adds every model index"""
+        from models.base_model import Base
+        with open("migrate_mysql_indexes.sql") as f:
+            script = f.read()
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                self.assertIn("'{}', '{}'".format(table.name, index.name),
+                              script)
@@ -3,7 +3,7 @@
 Contains the TestFileStorageDocs classes
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 import inspect
 import models
 from models.engine import file_storage
@@ -17,7 +17,9 @@ from models.user import User
 import json
 import os
 import pep8
+import threading
 import unittest
+from unittest import mock
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
@@ -111,6 +113,7 @@ class TestFileStorage(unittest.TestCase):
             new_dict[key] = value.to_dict()
         string = json.dumps(new_dict)
         with open("file.json", "r") as f:
+            self.assertTrue(f.readline().startswith("#sha256 "))
             js = f.read()
         self.assertEqual(json.loads(string), json.loads(js))
 
@@ -141,3 +144,606 @@ class TestFileStorage(unittest.TestCase):
         self.storage.save()
         c = self.storage.count()
         self.assertEqual(len(self.storage.all()), c)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls_uses_class_bucket(self):
+        """Test that all(cls) and count(cls) follow new() and delete()"""
+        storage = FileStorage()
+        state = State(name="Lagos")
+        city = City(name="Ikeja")
+        storage.new(state)
+        storage.new(city)
+        key = "State." + state.id
+        self.assertIn(key, storage.all(State))
+        self.assertIn(key, storage.all("State"))
+        self.assertNotIn(key, storage.all(City))
+        self.assertEqual(storage.count(State), len(storage.all(State)))
+        storage.delete(state)
+        storage.delete(city)
+        self.assertNotIn(key, storage.all(State))
+        self.assertNotIn("City." + city.id, storage.all(City))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_save_journal(self):
+        """Test that journal mode appends changes and reload replays them"""
+        storage = FileStorage()
+        FileStorage._FileStorage__journal = True
+        try:
+            storage.compact()
+            state = State(name="Kano")
+            key = "State." + state.id
+            storage.new(state)
+            storage.save()
+            with open("file.json.journal", "r") as f:
+                lines = f.readlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(json.loads(lines[0])["key"], key)
+            with open("file.json", "r") as f:
+                f.readline()
+                self.assertNotIn(key, json.loads(f.read()))
+            storage.delete(state)
+            storage.reload()
+            self.assertIn(key, storage.all(State))
+            storage.delete(storage.get(State, state.id))
+            storage.save()
+            with open("file.json.journal", "a") as f:
+                f.write('{"key": "State.torn", "ob')
+            storage.reload()
+            self.assertNotIn(key, storage.all())
+            with open("file.json.journal", "r") as f:
+                self.assertEqual(len(f.readlines()), 2)
+        finally:
+            FileStorage._FileStorage__journal = False
+            storage.compact()
+        self.assertFalse(os.path.exists("file.json.journal"))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_damaged_snapshot(self):
+        """Test that reload falls back to the backup of a damaged file"""
+        storage = FileStorage()
+        state = State(name="Oyo")
+        storage.new(state)
+        storage.save()
+        storage.save()
+        with open("file.json", "r+") as f:
+            f.seek(0, os.SEEK_END)
+            f.truncate(f.tell() // 2)
+        storage.delete(state)
+        storage.reload()
+        self.assertIn("State." + state.id, storage.all(State))
+        storage.save()
+        with open("file.json.bak", "r") as f:
+            self.assertTrue(f.readline().startswith("#sha256 "))
+            self.assertIn("State." + state.id, json.loads(f.read()))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_write_snapshot_fails(self):
+        """Test that a snapshot that cannot be written leaves the JSON file
+        as it was and no temporary file, and that the backup is copied
+        where hard links are refused"""
+        storage = FileStorage()
+        state = State(name="Edo")
+        storage.new(state)
+        storage.compact()
+        with open("file.json", "r") as f:
+            before = f.read()
+        with mock.patch("models.engine.serializer.dumps",
+                        side_effect=TypeError("cannot serialize")):
+            self.assertRaises(TypeError, storage.compact)
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        with open("file.json", "r") as f:
+            self.assertEqual(f.read(), before)
+        with mock.patch("os.link", side_effect=OSError("no links")):
+            storage.compact()
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        with open("file.json.bak", "r") as f:
+            self.assertEqual(f.read(), before)
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_batch_defers_save(self):
+        """Test that saves inside batch() are written once at its end"""
+        storage = FileStorage()
+        storage.save()
+        with open("file.json", "r") as f:
+            before = f.read()
+        with storage.batch():
+            states = [State(name="State {}".format(i)) for i in range(3)]
+            for state in states:
+                state.save()
+            with open("file.json", "r") as f:
+                self.assertEqual(f.read(), before)
+        with open("file.json", "r") as f:
+            f.readline()
+            saved = json.loads(f.read())
+        for state in states:
+            self.assertIn("State." + state.id, saved)
+            storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_batch_rolls_back(self):
+        """Test that a batch() block that raises writes nothing and puts
+        the objects back as they were saved"""
+        storage = FileStorage()
+        kept = State(name="Kept")
+        gone = State(name="Gone")
+        storage.new(kept)
+        storage.new(gone)
+        storage.save()
+        with open("file.json", "r") as f:
+            before = f.read()
+        with self.assertRaises(RuntimeError):
+            with storage.batch():
+                added = State(name="Added")
+                added.save()
+                kept.name = "Renamed"
+                kept.save()
+                storage.delete(gone)
+                storage.save()
+                raise RuntimeError("failed halfway")
+        with open("file.json", "r") as f:
+            self.assertEqual(f.read(), before)
+        self.assertIsNone(storage.get(State, added.id))
+        self.assertEqual(storage.get(State, kept.id).name, "Kept")
+        self.assertEqual(storage.get(State, gone.id).name, "Gone")
+        storage.save()
+        with open("file.json", "r") as f:
+            f.readline()
+            saved = json.loads(f.read())
+        self.assertNotIn("State." + added.id, saved)
+        self.assertEqual(saved["State." + kept.id]["name"], "Kept")
+        for state in (kept, gone):
+            storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_layouts(self):
+        """Test that reload reads per-line snapshots and single-line files"""
+        storage = FileStorage()
+        state = State(name="Edo")
+        key = "State." + state.id
+        storage.new(state)
+        storage.save()
+        with open("file.json", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(lines[1], "{\n")
+        self.assertEqual(lines[-1], "}\n")
+        storage.delete(state)
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Edo")
+        storage.delete(storage.get(State, state.id))
+        with open("file.json", "w") as f:
+            json.dump({key: state.to_dict()}, f)
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).name, "Edo")
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_reload_lazy(self):
+        """Test that lazy mode builds objects only when they are accessed"""
+        storage = FileStorage()
+        state = State(name="Kwara")
+        key = "State." + state.id
+        storage.new(state)
+        storage.save()
+        count = storage.count()
+        storage.delete(state)
+        FileStorage._FileStorage__lazy = True
+        try:
+            storage.reload()
+        finally:
+            FileStorage._FileStorage__lazy = False
+        self.assertNotIn(key, storage._FileStorage__objects)
+        self.assertEqual(storage.count(), count)
+        self.assertEqual(storage.get(State, state.id).name, "Kwara")
+        self.assertIn(key, storage._FileStorage__objects)
+        self.assertEqual(len(storage.all()), count)
+        storage.delete(storage.get(State, state.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related(self):
+        """Test that related() follows new(), delete() and changed keys"""
+        storage = FileStorage()
+        lagos = State(name="Lagos")
+        oyo = State(name="Oyo")
+        city = City(name="Ikeja", state_id=lagos.id)
+        place = Place(name="Flat", city_id=city.id)
+        amenity = Amenity(name="Wifi")
+        for obj in (lagos, oyo, city, place, amenity):
+            storage.new(obj)
+        self.assertEqual(lagos.cities, [city])
+        self.assertEqual(city.places, [place])
+        self.assertEqual(place.amenities, [])
+        place.amenity_ids.append(amenity.id)
+        storage.new(place)
+        self.assertEqual(place.amenities, [amenity])
+        self.assertEqual(storage.related(Place, "amenity_ids", amenity.id),
+                         [place])
+        city.state_id = oyo.id
+        storage.new(city)
+        self.assertEqual(lagos.cities, [])
+        self.assertEqual(oyo.cities, [city])
+        storage.delete(city)
+        self.assertEqual(oyo.cities, [])
+        for obj in (lagos, oyo, place, amenity):
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places(self):
+        """Test that search_places combines states, cities and amenities"""
+        storage = FileStorage()
+        state = State(name="Lagos")
+        ikeja = City(name="Ikeja", state_id=state.id)
+        ibadan = City(name="Ibadan", state_id="elsewhere")
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        flat = Place(name="Flat", city_id=ikeja.id,
+                     amenity_ids=[wifi.id, pool.id])
+        room = Place(name="Room", city_id=ibadan.id, amenity_ids=[wifi.id])
+        objs = [state, ikeja, ibadan, wifi, pool, flat, room]
+        for obj in objs:
+            storage.new(obj)
+        self.assertEqual(storage.search_places(states=[state.id]), [flat])
+        self.assertEqual(storage.search_places(states=[state.id],
+                                               cities=[ibadan.id]),
+                         [flat, room])
+        self.assertEqual(storage.search_places(amenities=[wifi.id, pool.id]),
+                         [flat])
+        self.assertEqual(storage.search_places(cities=[ibadan.id],
+                                               amenities=[pool.id]), [])
+        self.assertEqual(storage.search_places(amenities=["missing"]), [])
+        self.assertIn(room, storage.search_places())
+        for obj in objs:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places_amenity_bitmaps(self):
+        """Test that the amenity bitmaps follow new() and delete()"""
+        from models.engine.bitmaps import BitmapIndex
+        storage = FileStorage()
+        wifi = Amenity(name="Wifi")
+        pool = Amenity(name="Pool")
+        places = [Place(name=str(i), amenity_ids=[wifi.id]) for i in range(9)]
+        for obj in [wifi, pool] + places:
+            storage.new(obj)
+        places[3].amenity_ids.append(pool.id)
+        storage.new(places[3])
+        both = [wifi.id, pool.id]
+        self.assertEqual(storage.search_places(amenities=both), [places[3]])
+        storage.delete(places[3])
+        self.assertEqual(storage.search_places(amenities=both), [])
+        places[5].amenity_ids.append(pool.id)
+        storage.new(places[5])
+        self.assertEqual(storage.search_places(amenities=both), [places[5]])
+        index = BitmapIndex()
+        for i in range(100):
+            index.set(str(i), ["odd" if i % 2 else "even", "all"])
+        index.remove("4")
+        index.set("new", ["odd"])
+        self.assertEqual(index.ordinals["new"], 4)
+        self.assertEqual(index.select(["odd", "all"], ["0", "1", "2"]),
+                         ["1"])
+        self.assertEqual(index.select(["odd", "all"], ["new", "3"]), ["3"])
+        self.assertEqual(len(index.select(["odd", "all"])), 50)
+        self.assertIn("new", index.select(["odd"]))
+        for obj in [wifi, pool] + places:
+            storage.delete(obj)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_place_columns_threads(self):
+        """Test that places come and go while another thread selects"""
+        from models.engine.columns import PlaceColumns
+        columns = PlaceColumns()
+        for i in range(20000):
+            columns.set(str(i), Place(price_by_night=i % 100, max_guest=2))
+        errors = []
+        done = threading.Event()
+
+        def churn():
+            """adds and removes a place until done is set"""
+            try:
+                while not done.is_set():
+                    columns.set("new", Place(price_by_night=5))
+                    columns.remove("new")
+            except Exception as err:
+                errors.append(err)
+        thread = threading.Thread(target=churn)
+        thread.start()
+        try:
+            for _ in range(50):
+                found = columns.select(price_max=49, min_guests=1)
+                self.assertEqual(len(found), 10000)
+        finally:
+            done.set()
+            thread.join()
+        self.assertEqual(errors, [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places_ranges(self):
+        """Test that search_places filters on the numeric ranges"""
+        storage = FileStorage()
+        city = City(name="Ikeja")
+        cheap = Place(name="Cheap", city_id=city.id, price_by_night=40,
+                      max_guest=2, number_rooms=1)
+        large = Place(name="Large", city_id=city.id, price_by_night=200,
+                      max_guest=8, number_rooms=4)
+        odd = Place(name="Odd", city_id="elsewhere", price_by_night="n/a",
+                    max_guest=8, number_rooms=4)
+        for place in (cheap, large, odd):
+            storage.new(place)
+        self.assertEqual(storage.search_places(cities=[city.id],
+                                               price_max=100), [cheap])
+        self.assertEqual(storage.search_places(price_min=150, min_guests=8,
+                                               price_max=250), [large])
+        self.assertEqual(storage.search_places(cities=[city.id, "elsewhere"],
+                                               min_rooms=4), [large, odd])
+        large.price_by_night = 90
+        storage.new(large)
+        storage.delete(cheap)
+        self.assertEqual(storage.search_places(cities=[city.id],
+                                               price_max=100), [large])
+        for place in (large, odd):
+            storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_places_geo(self):
+        """Test that search_places finds places near a point or in a box"""
+        storage = FileStorage()
+        city = City(name="Lagos")
+        ikeja = Place(name="Ikeja", city_id=city.id, latitude=6.6018,
+                      longitude=3.3515)
+        lekki = Place(name="Lekki", city_id=city.id, latitude=6.4698,
+                      longitude=3.5852)
+        abuja = Place(name="Abuja", city_id="elsewhere", latitude=9.0765,
+                      longitude=7.3986)
+        fiji = Place(name="Fiji", city_id="elsewhere", latitude=-17.7,
+                     longitude=179.9)
+        places = (ikeja, lekki, abuja, fiji)
+        for place in places:
+            storage.new(place)
+        self.assertEqual(storage.search_places(near=(6.59, 3.34, 50)),
+                         [ikeja, lekki])
+        self.assertEqual(storage.search_places(near=(6.47, 3.58, 1000)),
+                         [lekki, ikeja, abuja])
+        self.assertEqual(storage.search_places(near=(6.47, 3.58, 1000),
+                                               cities=["elsewhere"],
+                                               limit=1), [abuja])
+        self.assertEqual(storage.search_places(bbox=(3, 6, 4, 7)),
+                         [ikeja, lekki])
+        self.assertEqual(storage.search_places(bbox=(170, -20, -170, 0)),
+                         [fiji])
+        self.assertEqual(storage.search_places(near=(-17.7, -179.9, 50)),
+                         [fiji])
+        lekki.latitude = 9.0
+        storage.new(lekki)
+        self.assertEqual(storage.search_places(bbox=(3, 6, 4, 7)), [ikeja])
+        unlocated = Place(name="Nowhere", city_id=city.id)
+        storage.new(unlocated)
+        self.assertEqual(storage.search_places(cities=[city.id],
+                                               bbox=(-180, -90, 180, 90)),
+                         [ikeja, lekki])
+        storage.delete(ikeja)
+        self.assertEqual(storage.search_places(near=(6.59, 3.34, 50)), [])
+        for place in places + (unlocated,):
+            storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_amenity_ids_not_strings(self):
+        """Test that amenity_ids items that are not strings are stored but
+        not indexed, and that an index refusing an object does not stop
+        reload()"""
+        storage = FileStorage()
+        place = Place(name="Odd", amenity_ids=[{"a": 1}, ["b"], "wifi"])
+        key = "Place." + place.id
+        storage.new(place)
+        storage.save()
+        self.assertEqual(storage.related(Place, "amenity_ids", "wifi"),
+                         [place])
+        self.assertEqual(FileStorage._FileStorage__amenities.values[key],
+                         ("wifi",))
+        storage.reload()
+        self.assertEqual(storage.get(Place, place.id).amenity_ids,
+                         [{"a": 1}, ["b"], "wifi"])
+        bitmaps = FileStorage._FileStorage__amenities
+        with mock.patch.object(bitmaps, "set", side_effect=TypeError):
+            storage.reload()
+        self.assertIn(key, storage.all(Place))
+        storage.delete(storage.get(Place, place.id))
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_new_refused_by_index(self):
+        """Test that an object an index refuses is not left in __objects"""
+        storage = FileStorage()
+        storage.page(State)
+        state = State(name="Enugu")
+        state.created_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        with self.assertRaises(TypeError):
+            storage.new(state)
+        self.assertNotIn("State." + state.id, storage.all(State))
+        self.assertIsNone(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_search_text(self):
+        """Test that search and the q criterion rank by the words held"""
+        storage = FileStorage()
+        city = City(name="Calabar")
+        loft = Place(name="Zebrawood loft", city_id=city.id,
+                     description="Quiet loft with a Zebrawood floor")
+        villa = Place(name="Villa", city_id=city.id,
+                      description="A villa by the sea, with a zebrawood "
+                      "deck, a pool, a garden, a gym and a long drive")
+        hut = Place(name="Hut", city_id=city.id, description="Quiet hut")
+        review = Review(place_id=loft.id, text="Quiet, QUIET street")
+        other = Review(place_id=villa.id, text="quiet")
+        objs = (loft, villa, hut, review, other)
+        for obj in objs:
+            storage.new(obj)
+        self.assertEqual(storage.search_places(cities=[city.id],
+                                               q="zebrawood"), [loft, villa])
+        self.assertEqual(storage.search_places(cities=[city.id],
+                                               q="quiet zebrawood",
+                                               limit=2), [loft, hut])
+        self.assertEqual(storage.search_places(cities=[city.id], q="?"), [])
+        self.assertEqual(storage.search(Review, "quiet", place_id=loft.id),
+                         [review])
+        hut.description = "Zebrawood, zebrawood"
+        storage.new(hut)
+        self.assertEqual(storage.search_places(cities=[city.id],
+                                               q="zebrawood"),
+                         [hut, loft, villa])
+        storage.delete(loft)
+        self.assertEqual(storage.search_places(cities=[city.id],
+                                               q="quiet"), [])
+        for obj in objs:
+            storage.delete(obj)
+        self.assertEqual(storage.search(Review, "quiet", place_id=loft.id),
+                         [])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_serializer_backends(self):
+        """Test that every installed JSON backend round-trips a record"""
+        from models.engine import serializer
+        record = Place(name="Café/Bar", max_guest=4, latitude=6.5,
+                       amenity_ids=["a"]).to_dict()
+        self.assertIn(serializer.name, serializer.available())
+        for name in serializer.available():
+            dumps, loads = serializer.backend(name)
+            text = dumps(record)
+            self.assertEqual(loads(text), record)
+            self.assertEqual(loads(text.encode()), record)
+            self.assertEqual(json.loads(text), record)
+        with self.assertRaises(ValueError):
+            serializer.backend("pickle")
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_serializer_wide_integers(self):
+        """Test that integers past 64 bits are written and read back by
+        every backend, and by save() and reload()"""
+        from models.engine import serializer
+        record = {"pop": 10 ** 20, "low": -2 ** 70, "small": 5}
+        for name in serializer.available():
+            dumps, loads = serializer.backend(name)
+            text = dumps(record)
+            self.assertEqual(json.loads(text), record)
+            self.assertEqual(loads(text), record)
+            self.assertEqual(loads(text.encode()), record)
+        storage = FileStorage()
+        state = State(name="Wide", pop=10 ** 20)
+        storage.new(state)
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.tmp"))
+        storage.reload()
+        self.assertEqual(storage.get(State, state.id).pop, 10 ** 20)
+        storage.delete(state)
+        storage.save()
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_subscribe(self):
+        """Test that listeners hear about new, deleted and reloaded objects"""
+        storage = FileStorage()
+        seen = []
+        storage.subscribe(seen.append)
+        try:
+            state = State(name="Kano")
+            storage.new(state)
+            storage.delete(state)
+            storage.reload()
+        finally:
+            FileStorage._FileStorage__listeners.remove(seen.append)
+        self.assertEqual(seen, [state, state, None])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_freshness(self):
+        """Test that freshness returns the latest updated_at and count"""
+        storage = FileStorage()
+        city = City(name="Ibadan")
+        places = [Place(name="Place {}".format(i), city_id=city.id)
+                  for i in range(3)]
+        self.assertEqual(storage.freshness(Place, city_id=city.id), (None, 0))
+        for place in places:
+            storage.new(place)
+        places[0].updated_at = datetime(2100, 1, 1)
+        self.assertEqual(storage.freshness(Place, city_id=city.id),
+                         (datetime(2100, 1, 1), 3))
+        latest, count = storage.freshness(Place)
+        self.assertEqual(latest, datetime(2100, 1, 1))
+        self.assertEqual(count, storage.count(Place))
+        for place in places:
+            storage.delete(place)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bulk(self):
+        """Test that the bulk methods change many objects with one save"""
+        storage = FileStorage()
+        place = Place(name="Bulk")
+        reviews = [Review(place_id=place.id, text=str(i)) for i in range(5)]
+        storage.bulk_new(reviews)
+        self.assertEqual(storage.related(Review, "place_id", place.id),
+                         reviews)
+        storage.bulk_update(Review, [{"id": reviews[0].id, "text": "new",
+                                      "created_at": "ignored"},
+                                     {"id": "missing", "text": "new"}])
+        self.assertEqual(reviews[0].text, "new")
+        self.assertIsInstance(reviews[0].created_at, datetime)
+        storage.bulk_delete("Review", [review.id for review in reviews[1:]])
+        storage.reload()
+        found = storage.related(Review, "place_id", place.id)
+        self.assertEqual([(r.id, r.text) for r in found],
+                         [(reviews[0].id, "new")])
+        storage.bulk_delete(Review, [reviews[0].id])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_shared_references(self):
+        """Test that reloaded objects share the ids and dates they hold
+        in common"""
+        storage = FileStorage()
+        place = Place(name="Shared")
+        reviews = [Review(place_id=place.id, text=str(i)) for i in range(2)]
+        for review in reviews:
+            storage.new(review)
+        storage.save()
+        storage.reload()
+        first, second = [storage.get(Review, review.id)
+                         for review in reviews]
+        self.assertIsNot(first, reviews[0])
+        self.assertIs(first.place_id, second.place_id)
+        self.assertIs(first.updated_at, first.created_at)
+        self.assertEqual(list(first.to_dict())[:3],
+                         ["id", "created_at", "updated_at"])
+        for review in reviews:
+            storage.delete(review)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """Test that page walks a class in (created_at, id) order"""
+        storage = FileStorage()
+        city = City(name="Abuja")
+        places = [Place(name="Place {}".format(i), city_id=city.id)
+                  for i in range(5)]
+        for place in reversed(places):
+            storage.new(place)
+        first = storage.page(Place, 2, city_id=city.id)
+        self.assertEqual(first, places[:2])
+        after = (first[-1].created_at, first[-1].id)
+        self.assertEqual(storage.page(Place, 2, after, city_id=city.id),
+                         places[2:4])
+        ordered = storage.page(Place)
+        self.assertEqual(ordered, sorted(ordered, key=lambda p: (
+            p.created_at, p.id)))
+        storage.delete(places[1])
+        self.assertNotIn(places[1], storage.page(Place))
+        self.assertEqual(storage.page(Place, 1, after, city_id=city.id),
+                         places[2:3])
+        streamed = storage.page(Place, stream=True)
+        self.assertNotIsInstance(streamed, list)
+        self.assertEqual(list(streamed), storage.page(Place))
+        streamed = storage.page(Place, 2, stream=True, city_id=city.id)
+        self.assertEqual(list(streamed), storage.page(Place, 2,
+                                                      city_id=city.id))
+        for place in places:
+            storage.delete(place)